@@ -0,0 +1,223 @@
+"""Headless batch generation of collision meshes over many .blend files.
+
+Run the controller from Blender, or from any Python with --blender pointing
+to the executable:
+
+    blender -b -P collision_batch.py -- assets/ --objects "SM_*" --jobs 4 \\
+        --output build/ --summary build/collision.json --set axis=Y_AXIS --set div=8
+
+Inputs are .blend files, directories (searched recursively) or glob patterns.
+Each file is processed by its own background Blender process, at most --jobs
+at a time, so memory is returned to the system after every file and a crash
+only fails that file. Every --set key=value is passed to
+OBJECT_OT_create_collision, values are read as JSON when possible and as
+plain strings otherwise. Files are saved in place unless --output is given.
+
+The summary lists the wall time, source and collision object counts, box
+count and error of every file. Boxes are counted per collision object, and
+only for box meshes: decimated meshes, convex decompositions and Force
+Convex hulls are left out. The exit status is 1 when any file failed.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatchcase
+
+# Not available when the controller runs outside Blender, or when the module
+# is re-imported by multiprocessing workers
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="collision_batch", description="Create collision meshes in .blend files")
+    parser.add_argument("inputs", nargs="*", help=".blend files, directories or glob patterns")
+    parser.add_argument("--objects", default="*", help="Mesh object name pattern")
+    parser.add_argument("--set", dest="params", action="append", default=[], metavar="KEY=VALUE",
+                        help="Operator property, may be repeated")
+    parser.add_argument("--output", help="Directory for the processed files, default saves in place")
+    parser.add_argument("--summary", help="JSON summary path, default prints to stdout")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Blender processes run at once")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds allowed per file")
+    parser.add_argument("--blender", default=None, help="Blender executable, default is the running one")
+    # Internal, set by the controller on worker processes
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    parser.add_argument("--save-as", dest="save_as", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def script_args():
+    """Arguments after '--', where Blender stops reading its own options"""
+    if("--" in sys.argv):
+        return sys.argv[sys.argv.index("--") + 1:]
+    return [] if bpy is not None else sys.argv[1:]
+
+
+def operator_params(pairs):
+    params = {}
+    for pair in pairs:
+        key, sep, value = pair.partition("=")
+        if(not sep):
+            raise ValueError("expected KEY=VALUE, got %r" % pair)
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return params
+
+
+def find_blend_files(inputs):
+    files = []
+    for item in inputs:
+        if(os.path.isdir(item)):
+            matches = glob.glob(os.path.join(item, "**", "*.blend"), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        files.extend(os.path.abspath(path) for path in sorted(matches) if path.endswith(".blend"))
+    return list(dict.fromkeys(files))
+
+
+def output_paths(files, output):
+    """Save path of every file, keeping the layout below their common folder"""
+    if(output is None):
+        return files
+    root = os.path.commonpath([os.path.dirname(path) for path in files])
+    return [os.path.join(os.path.abspath(output), os.path.relpath(path, root)) for path in files]
+
+
+def run_file(blender, path, save_as, args):
+    """Process one file in a background Blender, returns its summary entry"""
+    fd, result_path = tempfile.mkstemp(suffix=".json", prefix="collision_batch_")
+    os.close(fd)
+    command = [blender, "-b", "--factory-startup", path, "-P", os.path.abspath(__file__), "--",
+               "--worker", "--result", result_path, "--save-as", save_as, "--objects", args.objects]
+    for pair in args.params:
+        command += ["--set", pair]
+
+    entry = {"file": path, "output": save_as}
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                 timeout=args.timeout, universal_newlines=True)
+        entry["wall_seconds"] = time.perf_counter() - start
+        try:
+            with open(result_path) as f:
+                entry.update(json.load(f))
+        except (OSError, ValueError):
+            entry["error"] = "Blender exited with code %d before writing a result\n%s" % (
+                process.returncode, process.stdout[-4000:])
+    except subprocess.TimeoutExpired:
+        entry["wall_seconds"] = time.perf_counter() - start
+        entry["error"] = "Timed out after %.0f seconds" % args.timeout
+    finally:
+        os.remove(result_path)
+    return entry
+
+
+def run_controller(args):
+    operator_params(args.params)
+    blender = args.blender or (bpy.app.binary_path if bpy is not None else None)
+    if(not blender):
+        raise SystemExit("collision_batch: --blender is required outside Blender")
+
+    files = find_blend_files(args.inputs)
+    save_paths = output_paths(files, args.output) if files else []
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        entries = list(executor.map(lambda item: run_file(blender, item[0], item[1], args), zip(files, save_paths)))
+
+    failed = [entry for entry in entries if "error" in entry]
+    summary = {
+        "files": entries,
+        "file_count": len(entries),
+        "failed": len(failed),
+        "boxes": sum(entry.get("boxes", 0) for entry in entries),
+        "wall_seconds": time.perf_counter() - start,
+        "params": operator_params(args.params),
+    }
+    text = json.dumps(summary, indent=2)
+    if(args.summary):
+        os.makedirs(os.path.dirname(os.path.abspath(args.summary)), exist_ok=True)
+        with open(args.summary, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+    for entry in failed:
+        print("collision_batch: %s failed\n%s" % (entry["file"], entry["error"]), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def count_boxes(objects):
+    """Boxes of the collision objects, None when none of them is made of boxes"""
+    counts = [obj.data.get("collision_boxes") for obj in objects if obj.type == 'MESH']
+    counts = [count for count in counts if count is not None]
+    return sum(counts) if counts else None
+
+
+def run_worker(args):
+    """Generate collision meshes in the currently loaded file and save it"""
+    result = {"objects": 0, "collision_objects": 0}
+    start = time.perf_counter()
+    try:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        import simple_collision_boxes
+        simple_collision_boxes.register()
+
+        params = operator_params(args.params)
+        suffix = params.get("suffix", "-colonly")
+        view_layer = bpy.context.view_layer
+        # Skip collision objects from earlier runs
+        sources = [obj for obj in view_layer.objects
+                   if obj.type == 'MESH' and fnmatchcase(obj.name, args.objects) and not obj.name.endswith(suffix)]
+        for obj in view_layer.objects:
+            obj.select_set(False)
+        for obj in sources:
+            obj.select_set(True)
+
+        if(sources):
+            view_layer.objects.active = sources[0]
+            existing = set(bpy.data.objects)
+            bpy.ops.mesh.create_simple_collision(**params)
+            created = [obj for obj in bpy.data.objects if obj not in existing]
+            result["objects"] = len(sources)
+            result["collision_objects"] = len(created)
+            boxes = count_boxes(created)
+            if(boxes is not None):
+                result["boxes"] = boxes
+
+        os.makedirs(os.path.dirname(args.save_as), exist_ok=True)
+        bpy.ops.wm.save_as_mainfile(filepath=args.save_as, copy=True)
+    except Exception:
+        result["error"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+
+    with open(args.result, "w") as f:
+        json.dump(result, f)
+    return 1 if "error" in result else 0
+
+
+def main():
+    args = parse_args(script_args())
+    if(args.worker):
+        if(bpy is None):
+            raise SystemExit("collision_batch: --worker must run inside Blender")
+        return run_worker(args)
+    return run_controller(args)
+
+
+# Guarded so multiprocessing spawn, which re-imports this script as
+# __mp_main__, does not start another batch
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,330 @@
+"""Benchmarks of the collision box modes on synthetic meshes.
+
+Times every axis, subdivision and collapse combination on noisy spheres, long
+corridors and scan-like point clouds, reporting vertices per second and the
+peak memory allocated while computing. Runs headless on
+simple_collision_boxes.kernel alone:
+
+    python collision_bench.py --sizes 1e3 1e4 1e5 1e6 --save-baseline bench.json
+    python collision_bench.py --baseline bench.json
+
+or through the full operator, including mesh creation and Force Convex:
+
+    blender -b --factory-startup -P collision_bench.py -- --operator --baseline bench_op.json
+
+--hulls compares Force Convex on its own: kernel.convex_hull against the
+operator's bmesh.ops.convex_hull, over the slab box corners at each
+--hull-divs subdivision. The bmesh cases only run inside Blender:
+
+    blender -b --factory-startup -P collision_bench.py -- --hulls --shapes sphere --sizes 1e6
+
+With --baseline the run is compared case by case against a stored result and
+exits with status 1 when throughput drops or peak memory grows beyond
+--tolerance. Meshes use a fixed seed so runs are comparable across machines
+only in relative terms; store one baseline per machine. In kernel mode
+MIN_AXIS times kernel.convex_hull of the points followed by the calipers,
+and --convex times Force Convex as kernel.convex_hull over the box corners.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+from fnmatch import fnmatchcase
+
+import numpy as np
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from simple_collision_boxes import kernel
+
+
+def noisy_sphere(count, rng):
+    points = rng.normal(size=(count,3))
+    points /= np.linalg.norm(points, axis=1)[:,None]
+    points *= 1.0 + 0.02 * rng.normal(size=(count,1))
+    return points.astype(np.float32)
+
+
+def corridor(count, rng, length=40.0, width=3.0, height=3.0):
+    """Floor, ceiling and walls of a long straight hallway along X"""
+    wall = rng.integers(0, 4, count)
+    points = np.empty((count,3))
+    points[:,0] = rng.uniform(0.0, length, count)
+    points[:,1] = rng.uniform(0.0, width, count)
+    points[:,2] = rng.uniform(0.0, height, count)
+    points[wall == 0, 2] = 0.0
+    points[wall == 1, 2] = height
+    points[wall == 2, 1] = 0.0
+    points[wall == 3, 1] = width
+    points += 0.01 * rng.normal(size=points.shape)
+    return points.astype(np.float32)
+
+
+def scan_cloud(count, rng, size=20.0):
+    """Bumpy terrain with clustered props and a few stray outliers"""
+    points = np.empty((count,3))
+    points[:,:2] = rng.uniform(0.0, size, (count,2))
+    points[:,2] = 0.5 * np.sin(points[:,0]) * np.cos(0.7 * points[:,1])
+
+    props = rng.random(count) < 0.2
+    centers = rng.uniform(0.0, size, (8,3)) * (1.0, 1.0, 0.0)
+    points[props] = centers[rng.integers(0, 8, props.sum())] + rng.normal(scale=0.4, size=(props.sum(),3))
+    points[props, 2] = np.abs(points[props, 2])
+
+    outliers = rng.random(count) < 0.001
+    points[outliers] += rng.normal(scale=5.0, size=(outliers.sum(),3))
+    points += 0.005 * rng.normal(size=points.shape)
+    return points.astype(np.float32)
+
+
+SHAPES = {
+    "sphere": noisy_sphere,
+    "corridor": corridor,
+    "scan": scan_cloud,
+}
+
+
+def bench_cases():
+    """Name and operator settings of every benchmarked combination"""
+    cases = {}
+    for axis in ("X_AXIS", "Y_AXIS", "Z_AXIS"):
+        for subdiv in ({"subdiv_type": "DIV", "div": 16}, {"subdiv_type": "CHK", "chk": 0.25}):
+            for collapse in ("NON", "AVG", "MIN", "MEDIAN", "WAVG", "UNION"):
+                name = "%s/%s/%s" % (axis, subdiv["subdiv_type"], collapse)
+                cases[name] = dict(subdiv, axis=axis, collapse=collapse)
+    cases["MIN_AXIS"] = {"axis": "MIN_AXIS"}
+    cases["FAST_AXIS"] = {"axis": "FAST_AXIS"}
+    cases["OCTREE"] = {"axis": "OCTREE"}
+    cases["CONVEX"] = {"axis": "CONVEX"}
+    return cases
+
+
+def hull_cases(divs):
+    """Name and settings of the Force Convex hull comparisons, see HullRunner"""
+    return {"hull/%d/%s" % (div, builder): {"div": div, "builder": builder}
+            for div in divs for builder in ("kernel", "bmesh")}
+
+
+class KernelRunner:
+    """Runs kernel.compute_boxes on raw coordinates"""
+
+    def __init__(self, points):
+        self.points = points
+
+    def prepare(self, settings):
+        return True
+
+    def items(self, settings):
+        return len(self.points)
+
+    def run(self, settings):
+        params = kernel.CollisionParams(**{key: value for key, value in settings.items()
+                                           if key in kernel.CollisionParams.__dataclass_fields__})
+        if(params.axis == "MIN_AXIS"):
+            # The operator builds the hull for every run as well, it is part of the case
+            hull_verts, hull_faces = kernel.convex_hull(self.points)
+            bb_verts, _ = kernel.compute_boxes(hull_verts, params, hull_faces)
+        else:
+            bb_verts, _ = kernel.compute_boxes(self.points, params)
+        if(settings.get("covex_mesh") and params.axis not in ("MIN_AXIS", "FAST_AXIS", "CONVEX")):
+            kernel.convex_hull(bb_verts)
+
+    def close(self):
+        pass
+
+
+class OperatorRunner:
+    """Runs the collision operator on a mesh object holding the coordinates"""
+
+    def __init__(self, points):
+        mesh = bpy.data.meshes.new("bench")
+        mesh.vertices.add(len(points))
+        mesh.vertices.foreach_set("co", points.ravel())
+        mesh.update()
+        self.source = bpy.data.objects.new("bench", mesh)
+        bpy.context.collection.objects.link(self.source)
+
+    def prepare(self, settings):
+        return True
+
+    def items(self, settings):
+        return len(self.source.data.vertices)
+
+    def run(self, settings):
+        view_layer = bpy.context.view_layer
+        for obj in view_layer.objects:
+            obj.select_set(obj == self.source)
+        view_layer.objects.active = self.source
+
+        existing = set(bpy.data.objects)
+        bpy.ops.mesh.create_simple_collision(parent=False, **settings)
+        for obj in set(bpy.data.objects) - existing:
+            mesh = obj.data
+            bpy.data.objects.remove(obj)
+            if(mesh is not None and mesh.users == 0):
+                bpy.data.meshes.remove(mesh)
+
+    def close(self):
+        mesh = self.source.data
+        bpy.data.objects.remove(self.source)
+        bpy.data.meshes.remove(mesh)
+
+
+class HullRunner:
+    """Builds the Force Convex hull of slab box corners, per hull builder
+
+    kernel is kernel.convex_hull, used headless; bmesh is the operator's
+    bmesh.ops.convex_hull path and only runs inside Blender. Throughput
+    counts box corners.
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self.corners = {}
+        self.builders = {"kernel": kernel.convex_hull}
+        if(bpy is not None):
+            from simple_collision_boxes import operators
+            self.builder = operators.CollisionBuilder()
+            self.builders["bmesh"] = self.bmesh_hull
+
+    def bmesh_hull(self, corners):
+        mesh = bpy.data.meshes.new("bench_hull")
+        try:
+            return self.builder.corner_hull(mesh, corners)
+        finally:
+            bpy.data.meshes.remove(mesh)
+
+    def prepare(self, settings):
+        if(settings["div"] not in self.corners):
+            params = kernel.CollisionParams(div=settings["div"])
+            self.corners[settings["div"]] = kernel.slab_boxes(self.points, params).astype(np.float32)
+        return settings["builder"] in self.builders
+
+    def items(self, settings):
+        return len(self.corners[settings["div"]])
+
+    def run(self, settings):
+        self.builders[settings["builder"]](self.corners[settings["div"]])
+
+    def close(self):
+        pass
+
+
+def measure(runner, settings, repeat):
+    """Best wall time of repeat runs, and peak traced memory of one more run"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        runner.run(settings)
+        best = min(best, time.perf_counter() - start)
+
+    # Traced separately, tracemalloc slows down allocation heavy code
+    tracemalloc.start()
+    try:
+        runner.run(settings)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def run_benchmarks(args):
+    all_cases = hull_cases(args.hull_divs) if args.hulls else bench_cases()
+    cases = {name: settings for name, settings in all_cases.items()
+             if any(fnmatchcase(name, pattern) for pattern in args.cases)}
+    extra = {"covex_mesh": True} if args.convex else {}
+    runner_type = HullRunner if args.hulls else OperatorRunner if args.operator else KernelRunner
+
+    results = {}
+    for shape in args.shapes:
+        for size in args.sizes:
+            count = int(float(size))
+            points = SHAPES[shape](count, np.random.default_rng(args.seed))
+            runner = runner_type(points)
+            try:
+                for name, settings in cases.items():
+                    key = "%s/%d/%s" % (shape, count, name)
+                    if(not runner.prepare(settings)):
+                        print("%-48s skipped" % key)
+                        continue
+                    seconds, peak = measure(runner, dict(settings, **extra), args.repeat)
+                    items = runner.items(settings)
+                    results[key] = {
+                        "seconds": seconds,
+                        "vertices_per_s": items / seconds if seconds > 0 else float("inf"),
+                        "peak_mb": peak / 2**20,
+                    }
+                    print("%-48s %10.4fs %14.0f vert/s %9.1f MB" % (
+                        key, seconds, results[key]["vertices_per_s"], results[key]["peak_mb"]))
+            finally:
+                runner.close()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Cases slower or hungrier than the baseline by more than tolerance"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if(base is None):
+            continue
+        if(result["vertices_per_s"] < base["vertices_per_s"] * (1.0 - tolerance)):
+            regressions.append("%s: %.0f vert/s, baseline %.0f" % (key, result["vertices_per_s"], base["vertices_per_s"]))
+        if(result["peak_mb"] > base["peak_mb"] * (1.0 + tolerance) + 1.0):
+            regressions.append("%s: %.1f MB peak, baseline %.1f" % (key, result["peak_mb"], base["peak_mb"]))
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="collision_bench", description="Benchmark collision box generation")
+    parser.add_argument("--sizes", nargs="+", default=["1e3", "1e4", "1e5", "1e6"], help="Vertex counts, e.g. 1e3 1e7")
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument("--cases", nargs="+", default=["*"], help="Case name patterns, e.g. 'X_AXIS/*' OCTREE")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case, the best one is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--operator", action="store_true", help="Time the Blender operator instead of the kernel")
+    parser.add_argument("--convex", action="store_true", help="Enable Force Convex")
+    parser.add_argument("--hulls", action="store_true",
+                        help="Compare the Force Convex hull builders on slab box corners instead")
+    parser.add_argument("--hull-divs", dest="hull_divs", nargs="+", type=int, default=[200, 10000, 50000],
+                        help="Subdivision numbers of the box corners compared with --hulls")
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--save-baseline", dest="save_baseline", help="Store the results as a baseline")
+    parser.add_argument("--baseline", help="Compare against a stored baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown or memory growth")
+    return parser.parse_args(argv)
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else ([] if bpy is not None else sys.argv[1:])
+    args = parse_args(argv)
+    if(args.operator and bpy is None):
+        raise SystemExit("collision_bench: --operator must run inside Blender")
+    if(args.operator):
+        import simple_collision_boxes
+        simple_collision_boxes.register()
+
+    results = run_benchmarks(args)
+    for path in (args.output, args.save_baseline):
+        if(path):
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+
+    if(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print("REGRESSION " + line)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+bl_info = {
+    "name": "Distribute in Grid",
+    "blender": (4, 0, 0),
+    "category": "Object",
+}
+
+# kernel.py is plain NumPy, operators.py holds everything that needs Blender
+
+# Reloading the add-on re-runs this file, reload the submodules along with it
+if "operators" in locals():
+    import importlib
+    for module in (kernel, operators):
+        importlib.reload(module)
+
+
+def register():
+    from . import operators
+    operators.register()
+
+def unregister():
+    from . import operators
+    operators.unregister()
@@ -0,0 +1,190 @@
+"""NumPy layout kernel behind the distribute in grid add-on.
+
+Objects come in as stacked bounding box corners and world matrices and
+positions go out as (N,3) arrays, so layouts of very large selections can be
+computed and checked outside Blender.
+"""
+
+import math
+
+import numpy as np
+
+# Above this many objects pack_rectangles uses shelves instead of a skyline,
+# the skyline search grows with the number of steps in its outline
+SKYLINE_LIMIT = 20000
+
+
+def world_extents(corners, matrices):
+    """World space AABB sizes, (N,3), of (N,8,3) local corners under (N,4,4) matrices"""
+    corners = np.asarray(corners, dtype=np.float64)
+    matrices = np.asarray(matrices, dtype=np.float64)
+    if(not len(corners)):
+        return np.empty((0,3))
+    # Translation moves min and max alike, only the 3x3 part changes the size
+    world = np.einsum("nij,nkj->nki", matrices[:,:3,:3], corners, optimize=True)
+    return world.max(axis=1) - world.min(axis=1)
+
+
+def grid_layout(sizes, order, cols, padding, corner, axes, spacing=None):
+    """Positions, (N,3) in object order, of objects laid in rows of cols
+
+    sizes are the (N,3) world extents, order the placement order and axes
+    the (row, column, normal) axis indices. Objects are placed from corner
+    along the row axis, one row after another along the column axis, with
+    padding between neighbours. Without spacing every column is as wide as
+    the two objects it joins and every row as tall as its tallest object,
+    with spacing (row, column) is a fixed pitch.
+    """
+    d1, d2, d3 = axes
+    count = len(order)
+    corner = np.asarray(corner, dtype=np.float64)
+    positions = np.empty((count,3))
+    positions[:,d3] = corner[d3]
+    if(not count):
+        return positions
+
+    rows = -(-count // cols)
+    slot = np.arange(count)
+    col, row = slot % cols, slot // cols
+    if(spacing is None):
+        # Sorted footprints as a (rows, cols) matrix, empty slots at the end
+        half = np.zeros((2, rows * cols))
+        half[:, :count] = sizes[order][:, (d1,d2)].T * 0.5
+        half = half.reshape(2, rows, cols)
+
+        steps = np.zeros((rows, cols))
+        steps[:,1:] = half[0,:,1:] + half[0,:,:-1]
+        centers1 = np.cumsum(steps, axis=1).ravel()[:count]
+
+        row_half = half[1].max(axis=1)
+        row_steps = np.zeros(rows)
+        row_steps[1:] = row_half[1:] + row_half[:-1]
+        centers2 = np.cumsum(row_steps)
+
+        positions[order,d1] = centers1 + padding * col + corner[d1]
+        positions[order,d2] = (centers2 + padding * np.arange(rows))[row] + corner[d2]
+    else:
+        positions[order,d1] = col * spacing[0] + corner[d1] + padding * col
+        positions[order,d2] = row * spacing[1] + corner[d2] + padding * row
+    return positions
+
+
+def _skyline_pack(sizes, order, width):
+    """Bottom left skyline packing, corners of the rectangles taken in order"""
+    corners = np.empty((len(sizes),2))
+    # Outline as steps starting at xs with heights ys, the last one ends at width
+    xs = np.zeros(1)
+    ys = np.zeros(1)
+    limit = width * (1.0 + 1e-12)
+    for k in order:
+        w, h = sizes[k]
+        reach = xs + w
+        # Each step may start the rectangle, which then rests on the highest
+        # step below it, reduceat takes that max over [start, end) windows
+        ends = np.searchsorted(xs, reach, side="left")
+        windows = np.empty(2 * len(xs), dtype=np.int64)
+        windows[0::2] = np.arange(len(xs))
+        windows[1::2] = ends
+        tops = np.maximum.reduceat(np.append(ys, -np.inf), windows)[0::2]
+        tops[reach > limit] = np.inf
+        i = int(np.argmin(tops))
+        end = int(ends[i])
+        top = tops[i]
+        corners[k] = xs[i], top
+
+        right = xs[i] + w
+        step_x, step_y = [xs[i]], [top + h]
+        if(right < (xs[end] if end < len(xs) else width)):
+            step_x.append(right)
+            step_y.append(ys[end-1])
+        xs = np.concatenate((xs[:i], step_x, xs[end:]))
+        ys = np.concatenate((ys[:i], step_y, ys[end:]))
+        keep = np.ones(len(xs), dtype=bool)
+        keep[1:] = ys[1:] != ys[:-1]
+        xs, ys = xs[keep], ys[keep]
+    return corners
+
+
+def _shelf_pack(sizes, order, width):
+    """Next fit shelves, corners of the rectangles taken in decreasing height"""
+    corners = np.empty((len(sizes),2))
+    widths = sizes[order,0]
+    ends = np.cumsum(widths)
+    start = 0
+    y = 0.0
+    while(start < len(order)):
+        base = ends[start] - widths[start]
+        stop = max(int(np.searchsorted(ends, base + width * (1.0 + 1e-12), side="right")), start + 1)
+        shelf = order[start:stop]
+        corners[shelf,0] = ends[start:stop] - widths[start:stop] - base
+        corners[shelf,1] = y
+        y += sizes[order[start],1]
+        start = stop
+    return corners
+
+
+def _pack_width(sizes, width, aspect):
+    if(width is None):
+        width = math.sqrt(float(sizes.prod(axis=1).sum()) * aspect)
+    return max(width, float(sizes[:,0].max()))
+
+
+def pack_rectangles(sizes, width=None, aspect=1.0):
+    """Lower left corners, (N,2), of (N,2) rectangles packed without overlap
+
+    The packing is width wide, or when width is None about aspect times as
+    wide as it is tall. Rectangles go tallest first into a bottom left
+    skyline, or into shelves for more than SKYLINE_LIMIT of them. Returns the
+    corners and the (width, height) of the packing.
+    """
+    sizes = np.asarray(sizes, dtype=np.float64)
+    if(not len(sizes)):
+        return np.empty((0,2)), np.zeros(2)
+    width = _pack_width(sizes, width, aspect)
+
+    order = np.lexsort((-sizes[:,0], -sizes[:,1]))
+    if(len(sizes) > SKYLINE_LIMIT):
+        corners = _shelf_pack(sizes, order, width)
+    else:
+        corners = _skyline_pack(sizes, order, width)
+    return corners, (corners + sizes).max(axis=0)
+
+
+def turn_candidates(sizes, padding, axes, width=None, aspect=1.0):
+    """Masks of objects to turn a quarter around the third axis before packing
+
+    The first lays every object with its longer side along the first axis,
+    as long as it still fits the packing width, which keeps shelves low. The
+    second stands every object with its longer side along the second axis.
+    Masks that turn nothing are left out.
+    """
+    d1, d2, _ = axes
+    footprints = np.asarray(sizes, dtype=np.float64)[:, (d1,d2)] + padding
+    limit = _pack_width(footprints, None if width is None else width + padding, aspect)
+    masks = ((footprints[:,1] > footprints[:,0]) & (footprints[:,1] <= limit),
+             footprints[:,0] > footprints[:,1])
+    return [mask for mask in masks if mask.any()]
+
+
+def pack_layout(sizes, padding, corner, axes, width=None, aspect=1.0, turned=None):
+    """Positions, (N,3) in object order, of objects packed in the axes plane
+
+    Footprints are the (N,3) world extents along the first two axes, grown
+    by padding so neighbours keep that gap. Footprints of the turned mask
+    swap their sides. The packing starts at corner and objects are centered
+    on their footprint. Returns the positions and the (width, height) of the
+    packing.
+    """
+    d1, d2, d3 = axes
+    corner = np.asarray(corner, dtype=np.float64)
+    footprints = np.asarray(sizes, dtype=np.float64)[:, (d1,d2)]
+    if(turned is not None):
+        footprints[turned] = footprints[turned, ::-1]
+    # The last gap of a row or column lies outside the packing
+    corners, extent = pack_rectangles(footprints + padding, None if width is None else width + padding, aspect)
+
+    positions = np.empty((len(footprints),3))
+    positions[:,d1] = corners[:,0] + footprints[:,0] * 0.5 + corner[d1]
+    positions[:,d2] = corners[:,1] + footprints[:,1] * 0.5 + corner[d2]
+    positions[:,d3] = corner[d3]
+    return positions, np.maximum(extent - padding, 0.0)
@@ -0,0 +1,293 @@
+import copy
+import bpy
+from bpy.props import FloatProperty, IntProperty, EnumProperty, BoolProperty, StringProperty
+import numpy as np
+from mathutils import Matrix
+
+from . import kernel
+
+class DistributeObjectsGrid(bpy.types.Operator):
+    """Object Cursor Array"""
+    bl_idname = "object.distribute_grid"
+    bl_label = "Distribute objects"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    total: bpy.props.IntProperty(name="Steps", default=2, min=1, max=100)
+    
+    mode : EnumProperty(
+        name='Mode',
+        description="Distribution options",
+        items=[
+            ("MIN", "Compact", "Minimum space without overlap"),
+            ("EQUIV", "Even space", "Even space without overlap"),
+            ("DISTANCE", "Distance", "User defined distance"),
+            ("PACK", "Packed", "Pack footprints tightly into a rectangle, rows are chosen automatically"),
+            ],
+        default="MIN"
+    )
+    plane : EnumProperty(
+        name='Plane',
+        description="Plane of grid",
+        items=[
+            ("XY_PLANE", "XY Plane", ""),
+            ("YX_PLANE", "YX Plane", ""),
+            ("XZ_PLANE", "XZ Plane", ""),
+            ("ZX_PLANE", "ZX Plane", ""),
+            ("YZ_PLANE", "YZ Plane", ""),
+            ("ZY_PLANE", "ZY Plane", ""),
+            ],
+        default="XY_PLANE"
+    )
+    distance1 : FloatProperty(
+        name='Distance 1',
+        description="Distance between objects in fist dimension",
+        min=0.0,
+        default=1.0,
+    )
+    distance2 : FloatProperty(
+        name='Distance 2',
+        description="Distance between objects in second dimension",
+        min=0.0,
+        default=1.0,
+    )
+    pack_width : FloatProperty(
+        name='Width',
+        description="Width of the packing along the first dimension, 0 follows the aspect ratio",
+        min=0.0,
+        default=0.0,
+    )
+    pack_aspect : FloatProperty(
+        name='Aspect',
+        description="Width to height ratio of the packing when no width is set",
+        min=0.01,
+        default=1.0,
+    )
+    pack_rotate : BoolProperty(
+        name='Rotate',
+        description="Turn objects a quarter around the plane normal when that makes the packing smaller",
+        default=False,
+    )
+    padding : FloatProperty(
+        name='Padding',
+        description="Separation between objects",
+        min=0.0,
+        default=0.1,
+    )
+    rows : IntProperty(
+        name = 'Rows',
+        description = "Rows of the grid",
+        min = 1,
+        default = 1
+    )
+    size_sort : EnumProperty(
+        name = 'Sort by size',
+        description = "Sort objects by size",
+        items=[
+            ("SMALLEST", "Smallest first", ""),
+            ("BIGGEST", "Biggest first", ""),
+            ("WHATEVER", "Whatever", ""),
+            ],
+        default = "SMALLEST"
+    )
+    apply : EnumProperty(
+        name = 'Apply',
+        description = "How the layout is written to the objects",
+        items=[
+            ("LOCATION", "Move objects", "Set the location of every object"),
+            ("PARENT", "Parent to empty", "Parent the objects to a new empty at the cursor, the whole layout then moves as one. Selected children stay with their parent"),
+            ],
+        default = "LOCATION"
+    )
+    def draw(self,context):
+        layout = self.layout
+        row = layout.row(align=True)
+        row.prop(self, 'mode')
+        if(self.mode == "MIN"):
+            row = layout.row(align=True)
+            row.prop(self, 'plane')
+        if(self.mode == "EQUIV"):
+            row = layout.row(align=True)
+            row.prop(self, 'plane')
+        elif self.mode == "DISTANCE":
+            row = layout.row(align=True)
+            row.prop(self, 'plane')
+            row = layout.row(align=True)
+            row.prop(self, 'distance1')
+            row.prop(self, 'distance2')
+        elif self.mode == "PACK":
+            row = layout.row(align=True)
+            row.prop(self, 'plane')
+            row = layout.row(align=True)
+            row.prop(self, 'pack_width')
+            row.prop(self, 'pack_aspect')
+            row = layout.row(align=True)
+            row.prop(self, 'pack_rotate')
+        if self.mode != "PACK":
+            row = layout.row(align=True)
+            row.prop(self, 'rows')
+            row = layout.row(align=True)
+            row.prop(self, 'size_sort')
+        row = layout.row(align=True)
+        row.prop(self, 'padding')
+        row = layout.row(align=True)
+        row.prop(self, 'apply')
+    
+    def execute(self, context):
+        scene = context.scene
+        cursor = scene.cursor.location
+        obj = context.active_object
+        objs =  context.selected_objects
+        if self.apply == "PARENT":
+            # Selected children keep their parent and move along with it
+            objs = self.selection_roots(objs)
+        obj_num = len(objs)
+
+        self.rows = min(self.rows,obj_num)
+        if obj_num < 2:
+            return {'FINISHED'}
+        corner = copy.deepcopy(cursor)
+        
+        #get object bounding box
+        distances = self.aabb_distance(objs)
+        #get their areas and sort if selected 
+        X,Y,Z = (0,1,2)
+
+        d1,d2,d3 = (X,Y,Z)
+        if self.plane == "XZ_PLANE":
+            d1,d2,d3 = (X,Z,Y)
+        elif self.plane == "YZ_PLANE":
+            d1,d2,d3 = (Y,Z,X)
+        elif self.plane == "YX_PLANE":
+            d1,d2,d3 = (Y,X,Z)
+        elif self.plane == "ZY_PLANE":
+            d1,d2,d3 = (Z,Y,X)
+        elif self.plane == "ZX_PLANE":
+            d1,d2,d3 = (Z,X,Y)
+
+        if(self.mode == "PACK"):
+            width = self.pack_width if self.pack_width > 0.0 else None
+            positions, extent = kernel.pack_layout(distances,self.padding,corner,(d1,d2,d3),width,self.pack_aspect)
+            turned = None
+            saved = 0.0
+            if self.pack_rotate:
+                area = extent.prod()
+                for mask in kernel.turn_candidates(distances,self.padding,(d1,d2,d3),width,self.pack_aspect):
+                    mask_positions, mask_extent = kernel.pack_layout(distances,self.padding,corner,(d1,d2,d3),width,self.pack_aspect,mask)
+                    if mask_extent.prod() < extent.prod():
+                        positions, extent, turned = mask_positions, mask_extent, mask
+                saved = area - extent.prod()
+            self.apply_layout(context,objs,positions,corner,turned,d3)
+            message = "Packed %d objects into %.3g x %.3g" % (obj_num, extent[0], extent[1])
+            if self.pack_rotate:
+                message += ", turning %d saved %.3g (%.1f%%)" % (
+                    0 if turned is None else turned.sum(), saved, 100.0 * saved / area if area > 0.0 else 0.0)
+            self.report({'INFO'},message)
+            return {'FINISHED'}
+
+        areas = np.multiply(distances[:,d1],distances[:,d2])
+
+        sorting = np.array(range(len(objs)))
+        if self.size_sort == "SMALLEST":
+            sorting = np.argsort(areas)
+        if self.size_sort == "BIGGEST":
+            sorting = np.flip(np.argsort(areas))
+
+        #get how many columns are needed for the objects
+        extra = obj_num % self.rows
+        cols = obj_num // self.rows
+
+        if cols == 0:
+            self.report({'WARNING'},"Too many rows")
+            return {'FINISHED'}
+        
+        if extra != 0:
+            cols += 1
+        
+        if cols * (self.rows - 1)>= obj_num : 
+            self.report({'WARNING'},"Number of rows chosen generates empty rows")
+            return {'FINISHED'}
+
+        spacing = None
+        if(self.mode == "EQUIV"):
+            spacing = (np.max(distances[:,d1]), np.max(distances[:,d2]))
+        elif(self.mode == "DISTANCE"):
+            spacing = (self.distance1, self.distance2)
+
+        positions = kernel.grid_layout(distances,sorting,cols,self.padding,corner,(d1,d2,d3),spacing)
+        self.apply_layout(context,objs,positions,corner)
+        return {'FINISHED'}
+
+    def apply_layout(self,context,objs,positions,corner,turned=None,axis=2):
+        """Write the (N,3) positions back, one location or matrix set per object
+
+        Objects in the turned mask are also rotated a quarter around axis.
+        """
+        if self.apply == "PARENT":
+            root = bpy.data.objects.new("Grid", None)
+            root.location = corner
+            context.collection.objects.link(root)
+            positions = positions - np.asarray(corner)
+            identity = Matrix.Identity(4)
+            for ob in objs:
+                # The empty is unrotated and unscaled, so the old world matrix
+                # as basis keeps rotation and scale, the location is set below
+                world = ob.matrix_world.copy()
+                ob.parent = root
+                ob.matrix_parent_inverse = identity
+                ob.matrix_basis = world
+
+        if turned is None:
+            for ob,position in zip(objs,positions.tolist()):
+                ob.location = position
+        else:
+            quarter = Matrix.Rotation(np.pi / 2, 4, "XYZ"[axis])
+            for ob,position,turn in zip(objs,positions.tolist(),turned.tolist()):
+                if turn:
+                    basis = quarter @ ob.matrix_basis
+                    basis.translation = position
+                    ob.matrix_basis = basis
+                else:
+                    ob.location = position
+        # Sets only tag the objects, evaluate them all at once
+        context.view_layer.update()
+
+    def selection_roots(self,objs):
+        """Objects without a selected ancestor, in selection order"""
+        selected = set(objs)
+        roots = []
+        for ob in objs:
+            parent = ob.parent
+            while parent is not None and parent not in selected:
+                parent = parent.parent
+            if parent is None:
+                roots.append(ob)
+        return roots
+
+    def aabb_distance(self,objs):
+        """World space bounding box size of every object, (N,3)"""
+        bounds = {}
+        index = np.empty(len(objs), dtype=np.int64)
+        matrices = np.empty((len(objs),4,4))
+        for i,obj in enumerate(objs):
+            # Linked duplicates share their local bounds, unless modifiers change them
+            key = obj.data if (obj.data is not None and not obj.modifiers) else obj
+            slot = bounds.get(key)
+            if slot is None:
+                slot = bounds[key] = (len(bounds), obj.bound_box)
+            index[i] = slot[0]
+            matrices[i] = obj.matrix_world
+        local = np.array([corners for _,corners in bounds.values()], dtype=np.float64).reshape(-1,8,3)
+        return kernel.world_extents(local[index],matrices)
+
+
+def menu_func(self, context):
+    self.layout.operator(DistributeObjectsGrid.bl_idname)
+
+def register():
+    bpy.utils.register_class(DistributeObjectsGrid)
+    bpy.types.VIEW3D_MT_object.append(menu_func)
+
+def unregister():
+    bpy.utils.unregister_class(DistributeObjectsGrid)
+    bpy.types.VIEW3D_MT_object.remove(menu_func)
+
@@ -0,0 +1,109 @@
+"""Regression tests of the grid layout kernel, run headless with pytest."""
+
+import numpy as np
+
+from distribute_objects_grid import kernel
+
+
+def reference_grid(sizes, order, rows, padding, corner, axes, spacing):
+    """Per-object placement loops of the operator before the layout kernel"""
+    d1, d2, d3 = axes
+    count = len(sizes)
+    cols = count // rows + (count % rows != 0)
+    positions = np.zeros((count,3))
+    if(spacing is None):
+        half1 = sizes[order][:,d1] * 0.5
+        centers1 = np.zeros(count)
+        for i in range(1, count):
+            if(i % cols != 0):
+                centers1[i] = half1[i] + half1[i-1] + centers1[i-1]
+        offsets1 = centers1 + np.array([padding * (i % cols) for i in range(count)])
+        half2 = np.array([np.max(sizes[order][i * cols:min(count, (i+1) * cols), d2]) * 0.5 for i in range(rows)])
+        offsets2 = np.zeros(rows)
+        for i in range(1, rows):
+            offsets2[i] = half2[i] + half2[i-1] + offsets2[i-1]
+        offsets2 += np.array([padding * i for i in range(rows)])
+        for slot, index in enumerate(order):
+            positions[index,d1] = offsets1[slot] + corner[d1]
+            positions[index,d2] = offsets2[slot // cols] + corner[d2]
+            positions[index,d3] = corner[d3]
+        return positions, cols
+
+    for slot, index in enumerate(order):
+        col, row = slot % cols, slot // cols
+        positions[index,d1] = col * spacing[0] + corner[d1] + padding * col
+        positions[index,d2] = row * spacing[1] + corner[d2] + padding * row
+        positions[index,d3] = corner[d3]
+    return positions, cols
+
+
+def test_world_extents_match_transformed_corners():
+    rng = np.random.default_rng(0)
+    lo = rng.normal(size=(200,3))
+    hi = lo + rng.uniform(size=(200,3))
+    picks = np.array([(x,y,z) for x in (0,1) for y in (0,1) for z in (0,1)])
+    corners = np.where(picks[None] == 0, lo[:,None], hi[:,None])
+    matrices = np.tile(np.identity(4), (200,1,1))
+    matrices[:,:3] = rng.normal(size=(200,3,4))
+
+    world = corners @ matrices[:,:3,:3].transpose(0,2,1) + matrices[:,None,:3,3]
+    np.testing.assert_allclose(kernel.world_extents(corners, matrices), np.ptp(world, axis=1))
+
+
+def test_grid_layout_matches_placement_loops():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        count = int(rng.integers(2, 150))
+        rows = int(rng.integers(1, count + 1))
+        if(-(-count // rows) * (rows - 1) >= count):
+            # The operator refuses layouts with empty rows
+            continue
+        sizes = rng.uniform(size=(count,3)) * rng.uniform(0.1, 5.0)
+        order = rng.permutation(count)
+        axes = tuple(int(axis) for axis in rng.permutation(3))
+        corner = rng.normal(size=3).astype(np.float32).astype(np.float64)
+        padding = float(rng.uniform())
+        for spacing in (None, (0.7, 1.3)):
+            expected, cols = reference_grid(sizes, order, rows, padding, corner, axes, spacing)
+            np.testing.assert_array_equal(kernel.grid_layout(sizes, order, cols, padding, corner, axes, spacing), expected)
+
+
+def footprint_overlaps(lo, hi, gap):
+    overlap = ((lo[:,None] < hi[None] + gap - 1e-9) & (lo[None] < hi[:,None] + gap - 1e-9)).all(axis=2)
+    np.fill_diagonal(overlap, False)
+    return overlap.any()
+
+
+def test_pack_layout_keeps_padding_between_objects():
+    rng = np.random.default_rng(2)
+    axes = (0, 2, 1)
+    for count in (1, 7, 800, kernel.SKYLINE_LIMIT + 1):
+        sizes = rng.lognormal(0.0, 0.8, (count,3))
+        positions, extent = kernel.pack_layout(sizes, 0.1, (1.0, 2.0, 3.0), axes, aspect=2.0)
+        footprints = sizes[:, (0,2)]
+        lo = positions[:, (0,2)] - footprints / 2
+        sample = rng.choice(count, min(count, 1500), replace=False)
+        assert not footprint_overlaps(lo[sample], (lo + footprints)[sample], 0.1)
+        assert (positions[:,1] == 2.0).all()
+        np.testing.assert_allclose(lo.min(axis=0), (1.0, 3.0), atol=1e-9)
+        assert ((lo + footprints).max(axis=0) <= np.array((1.0, 3.0)) + extent + 1e-9).all()
+
+
+def test_pack_rectangles_respects_width():
+    rng = np.random.default_rng(3)
+    sizes = rng.uniform(0.5, 2.0, (300,2))
+    corners, extent = kernel.pack_rectangles(sizes, width=10.0)
+    assert extent[0] <= 10.0 + 1e-9
+    assert (corners >= 0.0).all()
+    # A skyline leaves little of its rectangle empty on uniform sizes
+    assert sizes.prod(axis=1).sum() / extent.prod() > 0.85
+
+
+def test_turned_footprints_swap_sides():
+    sizes = np.array([[4.0, 1.0, 1.0], [1.0, 4.0, 1.0], [2.0, 2.0, 1.0]])
+    flat, upright = kernel.turn_candidates(sizes, 0.0, (0,1,2), width=10.0)
+    np.testing.assert_array_equal(flat, (False, True, False))
+    np.testing.assert_array_equal(upright, (True, False, False))
+
+    positions, extent = kernel.pack_layout(sizes, 0.0, (0.0, 0.0, 0.0), (0,1,2), width=10.0, turned=flat)
+    np.testing.assert_allclose(extent, (10.0, 2.0))
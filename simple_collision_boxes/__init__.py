@@ -0,0 +1,29 @@
+bl_info = {
+	"name": "Create simple collision mesh",
+	"author": "Jon Eunan Quinlivan Domínguez",
+	"version": (1, 2),
+	"blender": (3, 3, 1),
+	"location": "View3D > Add > Mesh > Create Collision Mesh",
+	"description" : "Create simplified meshes for collision meshes using vertex bounding boxes",
+	"warning": "",
+    "doc_url": "",
+	"category": "Add Mesh",
+}
+
+# bpy is only imported by operators, at register time
+
+# Blender runs this file again when the add-on is reloaded, the submodules
+# would otherwise keep their first imported code
+if "operators" in locals():
+    import importlib
+    for module in (kernel, profiling, cache, export, operators):
+        importlib.reload(module)
+
+
+def register():
+    from . import operators
+    operators.register()
+
+def unregister():
+    from . import operators
+    operators.unregister()
@@ -0,0 +1,98 @@
+"""On-disk cache of collision box results.
+
+Entries are .npz files named after a hash of the source vertex buffer and
+every setting that shaped the result, so unchanged assets skip the kernel
+entirely on the next run. The directory is kept under a byte budget by
+evicting the least recently used entries.
+"""
+
+import hashlib
+import os
+import tempfile
+import zipfile
+from dataclasses import astuple
+
+import numpy as np
+
+# Bump when the kernel output for the same inputs changes
+CACHE_VERSION = 3
+
+
+class DiskCache:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, coords, params, extra=(), triangles=None):
+        """key of a vertex array, and of the triangles when the result samples them"""
+        digest = self._digest(lambda: iter((coords,)), len(coords), params, extra)
+        if(triangles is not None):
+            digest.update(repr(triangles.shape).encode())
+            digest.update(np.ascontiguousarray(triangles, dtype=np.int32))
+        return digest.hexdigest()
+
+    def stream_key(self, read_chunks, count, params, extra=()):
+        """key of count vertices read in chunks, equal to key on the whole array"""
+        return self._digest(read_chunks, count, params, extra).hexdigest()
+
+    def _digest(self, read_chunks, count, params, extra):
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((CACHE_VERSION, astuple(params), tuple(extra), (count, 3))).encode())
+        for coords in read_chunks():
+            digest.update(np.ascontiguousarray(coords, dtype=np.float32))
+        return digest
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def load(self, key):
+        """Cached box corners, or (vertices, faces) of hulls, for key, or None on a miss"""
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                verts = data["verts"]
+                if("faces" in data):
+                    verts = (verts, data["faces"])
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+        try:
+            # Loading counts as a use for the LRU order
+            os.utime(path)
+        except OSError:
+            # Evicted by another process meanwhile, the boxes are still good
+            pass
+        return verts
+
+    def store(self, key, verts):
+        # A temporary file per writer, concurrent batch jobs may store the same key
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if(isinstance(verts, tuple)):
+                    np.savez(f, verts=verts[0], faces=verts[1])
+                else:
+                    np.savez(f, verts=verts)
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def evict(self):
+        """Drop least recently used entries until the directory fits max_bytes"""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".npz"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
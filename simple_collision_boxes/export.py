@@ -0,0 +1,67 @@
+"""Compact sidecar files of collision box primitives.
+
+A sidecar is a pair of files sharing a base path: <base>.npy holds every box as
+one kernel.BOX_DTYPE record (center, half extents and a (w,x,y,z)
+rotation, all float32), grouped by source object, and <base>.json indexes
+the objects into it. The .npy is a plain NumPy array so tools can memory map
+it and slice out one object without reading the rest:
+
+    from simple_collision_boxes.export import load_sidecar
+
+    boxes, index = load_sidecar("collision_boxes")
+    start, count = index["objects"]["Crate"]["start"], index["objects"]["Crate"]["count"]
+    crate = boxes[start:start + count]
+
+Boxes are in the local space of their source object, whose world matrix is
+stored in the index.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .kernel import BOX_DTYPE
+
+SIDECAR_VERSION = 1
+
+
+def sidecar_paths(base):
+    base = os.path.splitext(base)[0] if base.endswith((".npy", ".json")) else base
+    return base + ".npy", base + ".json"
+
+
+def write_sidecar(base, entries):
+    """Write [(object name, BOX_DTYPE records, 4x4 world matrix)] as a sidecar"""
+    array_path, index_path = sidecar_paths(base)
+    os.makedirs(os.path.dirname(os.path.abspath(array_path)), exist_ok=True)
+
+    objects = {}
+    start = 0
+    for name, records, matrix in entries:
+        objects[name] = {"start": start, "count": len(records), "matrix_world": [list(map(float, row)) for row in matrix]}
+        start += len(records)
+    boxes = np.concatenate([records for _, records, _ in entries]) if entries else np.empty(0, dtype=BOX_DTYPE)
+
+    index = {
+        "version": SIDECAR_VERSION,
+        "array": os.path.basename(array_path),
+        "dtype": [(name, str(BOX_DTYPE[name].base), BOX_DTYPE[name].shape) for name in BOX_DTYPE.names],
+        "space": "local",
+        "objects": objects,
+    }
+    # Written next to the target and swapped in, readers never see half a file
+    for path, write in ((array_path, lambda f: np.save(f, boxes)),
+                        (index_path, lambda f: f.write(json.dumps(index, indent=1).encode()))):
+        with open(path + ".tmp", "wb") as f:
+            write(f)
+        os.replace(path + ".tmp", path)
+    return array_path, index_path
+
+
+def load_sidecar(base, mmap_mode="r"):
+    """The boxes array, memory mapped by default, and the parsed index"""
+    array_path, index_path = sidecar_paths(base)
+    with open(index_path) as f:
+        index = json.load(f)
+    return np.load(array_path, mmap_mode=mmap_mode), index
@@ -0,0 +1,1185 @@
+"""NumPy geometry kernel behind the simple collision boxes add-on.
+
+Nothing in here imports bpy: points come in as plain (N,3) arrays, boxes go out
+as (8K,3) corner arrays, so the same code runs inside Blender, in worker
+processes and in a plain CPython session.
+"""
+
+import heapq
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from itertools import repeat
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .profiling import NULL_PROFILER
+
+AXIS_INDEX = {"X_AXIS": 0, "Y_AXIS": 1, "Z_AXIS": 2}
+
+# Corner layout of one slab box, as (min=0 / max=1) picks per component. The
+# first four corners form the face looking down the slab axis.
+BOX_CORNERS = {
+    "X_AXIS": ((0,0,0),(0,1,0),(0,1,1),(0,0,1),(1,0,0),(1,1,0),(1,1,1),(1,0,1)),
+    "Y_AXIS": ((0,0,0),(0,0,1),(1,0,1),(1,0,0),(0,1,0),(0,1,1),(1,1,1),(1,1,0)),
+    "Z_AXIS": ((0,0,0),(1,0,0),(1,1,0),(0,1,0),(0,0,1),(1,0,1),(1,1,1),(0,1,1)),
+    # Free standing boxes follow CUBE_VERTICES so CUBE_INDICES skins each one
+    "OCTREE": ((0,0,0),(0,0,1),(0,1,0),(0,1,1),(1,0,0),(1,0,1),(1,1,0),(1,1,1)),
+}
+
+# One record per box for export: center, half extents along the box axes and
+# the (w,x,y,z) quaternion rotating the unit axes onto them
+BOX_DTYPE = np.dtype([("center", np.float32, 3), ("half_extents", np.float32, 3), ("rotation", np.float32, 4)])
+
+# Quads joining one ring of four corners to the next along the slab axis
+SLAB_SIDE_QUADS = ((0,4,7,3),(3,7,6,2),(2,6,5,1),(1,5,4,0))
+
+CUBE_VERTICES = (
+    (-1,-1,-1),
+    (-1,-1,1),
+    (-1,1,-1),
+    (-1,1,1),
+    (1,-1,-1),
+    (1,-1,1),
+    (1,1,-1),
+    (1,1,1),
+)
+
+CUBE_INDICES = (
+    (0, 1, 3, 2),
+    (2, 3, 7, 6),
+    (6, 7, 5, 4),
+    (4, 5, 1, 0),
+    (2, 6, 4, 0),
+    (7, 3, 1, 5),
+)
+
+EMPTY_BOX_MSG = 'Too many subdivisions or offset too big, empty bounding boxes are being generated'
+BIG_CHUNK_MSG = 'Chunks too big, will default to single bounding box'
+EMPTY_DECIMATE_MSG = 'No faces are left after decimation, the mesh is degenerate'
+
+# Fixed DiTO-14 sample directions: the coordinate axes and the cube diagonals
+DITO_DIRECTIONS = np.array([
+    (1,0,0),(0,1,0),(0,0,1),
+    (1,1,1),(1,1,-1),(1,-1,1),(1,-1,-1),
+]) / np.array([1,1,1,math.sqrt(3),math.sqrt(3),math.sqrt(3),math.sqrt(3)])[:,None]
+
+# Memory budget for the projected hull points of one stack of caliper bases
+CALIPER_CHUNK_BYTES = 32 * 1024 * 1024
+
+# Integer normals of a 26-DOP: the axes first, then face and corner diagonals
+DOP_DIRECTIONS = np.array([
+    (1,0,0),(0,1,0),(0,0,1),
+    (1,1,0),(1,-1,0),(1,0,1),(1,0,-1),(0,1,1),(0,1,-1),
+    (1,1,1),(1,1,-1),(1,-1,1),(1,-1,-1),
+])
+
+# Split planes tried per axis when decomposing a part
+ACD_PLANES = 16
+# Cap on the points spread over large triangles before voxelizing
+ACD_MAX_SAMPLES = 2000000
+
+
+@dataclass(frozen=True)
+class CollisionParams:
+    """Operator settings the kernel depends on, hashable for use in cache keys"""
+    axis: str = "X_AXIS"
+    subdiv_type: str = "DIV"
+    div: int = 1
+    chk: float = 1.0
+    offset: float = 0.0
+    force_vol: bool = True
+    collapse: str = "NON"
+    fast_tolerance: float = 0.0
+    octree_depth: int = 5
+    octree_threshold: float = 50.0
+    max_boxes: int = 64
+    acd_max_hulls: int = 16
+    acd_max_verts: int = 32
+    acd_resolution: int = 32
+    acd_concavity: float = 2.0
+
+    @classmethod
+    def from_operator(cls, op):
+        return cls(**{f.name: getattr(op, f.name) for f in fields(cls)})
+
+
+def _report(report, message):
+    if report is not None:
+        report(message)
+
+
+def box_corners(bb_min, bb_max, axis):
+    """(8K,3) corners of the K boxes spanned by the (K,3) bb_min/bb_max rows"""
+    if axis not in BOX_CORNERS:
+        return np.empty((0,3))
+    bounds = np.stack((np.asarray(bb_min, dtype=np.float64), np.asarray(bb_max, dtype=np.float64)), axis=1)
+    corners = bounds[:, np.array(BOX_CORNERS[axis]), np.arange(3)]
+    return corners.reshape(-1,3)
+
+
+def bounding_box_verts(coords, params, report=None):
+    if(len(coords) < 2):
+        _report(report, EMPTY_BOX_MSG)
+        return np.empty((0,3))
+    return box_corners(coords.min(axis=0)[None], coords.max(axis=0)[None], params.axis)
+
+
+def slab_layout(lo, hi, params, report=None):
+    """Slab count and width spanning lo..hi along the axis, None for a single box"""
+    if(params.subdiv_type == "CHK"):
+        div = int((hi - lo)/params.chk)
+        if(div == 0):
+            _report(report, BIG_CHUNK_MSG)
+            return None
+        if(div == 1):
+            _report(report, BIG_CHUNK_MSG)
+        return div, params.chk
+
+    if(params.div == 1):
+        return None
+    return params.div, float((hi - lo)/params.div)
+
+
+def slab_edges(lo, div, chunk, offset):
+    min_pos = lo + offset
+    return min_pos + chunk * np.arange(div + 1, dtype=np.float64)
+
+
+def bin_slabs(coords, axis, edges, force_vol):
+    """Per-slab vertex counts and min/max corners in a single pass over coords
+
+    Slab i holds edges[i] <= co < edges[i+1]; with force_vol the first and last
+    slabs also take every vertex below and above them. Returns the indices of
+    the non-empty slabs with their counts, mins and maxs.
+    """
+    div = len(edges) - 1
+    slab = np.searchsorted(edges, coords[:,axis], side='right') - 1
+    if(force_vol):
+        np.clip(slab, 0, div - 1, out=slab)
+    else:
+        inside = (slab >= 0) & (slab < div)
+        slab = slab[inside]
+        coords = coords[inside]
+
+    if(len(slab) == 0):
+        return slab, slab, np.empty((0,3)), np.empty((0,3))
+
+    order = np.argsort(slab, kind='stable')
+    slab = slab[order]
+    coords = coords[order]
+    starts = np.flatnonzero(np.concatenate(([True], slab[1:] != slab[:-1])))
+    counts = np.diff(np.append(starts, len(slab)))
+    bb_min = np.minimum.reduceat(coords, starts, axis=0).astype(np.float64)
+    bb_max = np.maximum.reduceat(coords, starts, axis=0).astype(np.float64)
+    return slab[starts], counts, bb_min, bb_max
+
+
+def slab_bb_verts(slabs, counts, bb_min, bb_max, div, params, report=None):
+    """Corners of the slabs holding enough vertices to span a box"""
+    if(len(slabs) < div or np.any(counts < 2)):
+        _report(report, EMPTY_BOX_MSG)
+
+    full = counts >= 2
+    return box_corners(bb_min[full], bb_max[full], params.axis)
+
+
+def divide_mesh(coords, params, report=None):
+    """Slab box corners of one (N,3) vertex array, before any collapse"""
+    axis = AXIS_INDEX.get(params.axis)
+    if(axis is None or len(coords) < 2):
+        return bounding_box_verts(coords, params, report)
+
+    values = coords[:,axis]
+    lo = float(values.min())
+    layout = slab_layout(lo, float(values.max()), params, report)
+    if(layout is None):
+        return bounding_box_verts(coords, params, report)
+
+    div, chunk = layout
+    edges = slab_edges(lo, div, chunk, params.offset)
+    return slab_bb_verts(*bin_slabs(coords, axis, edges, params.force_vol), div, params, report)
+
+
+def divide_mesh_streamed(read_chunks, params, report=None):
+    """divide_mesh over vertex chunks, keeping running per-slab bounds
+
+    read_chunks() must return a fresh iterator of (n,3) arrays on each call,
+    the vertices are read once for the bounds and once for binning. Extra
+    memory scales with the slab count and chunk size, not the vertex count,
+    and the boxes match divide_mesh on the concatenated array.
+    """
+    count = 0
+    lo = np.full(3, np.inf, dtype=np.float32)
+    hi = np.full(3, -np.inf, dtype=np.float32)
+    for coords in read_chunks():
+        if(len(coords)):
+            count += len(coords)
+            np.minimum(lo, coords.min(axis=0), out=lo)
+            np.maximum(hi, coords.max(axis=0), out=hi)
+
+    axis = AXIS_INDEX.get(params.axis)
+    if(count < 2):
+        _report(report, EMPTY_BOX_MSG)
+        return np.empty((0,3))
+    layout = None
+    if(axis is not None):
+        layout = slab_layout(float(lo[axis]), float(hi[axis]), params, report)
+    if(layout is None):
+        return box_corners(lo[None], hi[None], params.axis)
+
+    div, chunk = layout
+    edges = slab_edges(float(lo[axis]), div, chunk, params.offset)
+    counts = np.zeros(div, dtype=np.int64)
+    bb_min = np.full((div,3), np.inf)
+    bb_max = np.full((div,3), -np.inf)
+    for coords in read_chunks():
+        slabs, slab_counts, slab_min, slab_max = bin_slabs(coords, axis, edges, params.force_vol)
+        counts[slabs] += slab_counts
+        bb_min[slabs] = np.minimum(bb_min[slabs], slab_min)
+        bb_max[slabs] = np.maximum(bb_max[slabs], slab_max)
+
+    slabs = np.flatnonzero(counts)
+    return slab_bb_verts(slabs, counts[slabs], bb_min[slabs], bb_max[slabs], div, params, report)
+
+
+def box_volumes(boxes):
+    """Volumes of a (K,8,3) stack of axis aligned boxes"""
+    return np.prod(boxes.max(axis=1) - boxes.min(axis=1), axis=1)
+
+
+def _weighted_box(boxes, axis):
+    weights = box_volumes(boxes)
+    if(weights.sum() <= 0):
+        return boxes.mean(axis=0)
+    return np.average(boxes, axis=0, weights=weights)
+
+
+def _union_box(boxes, axis):
+    return box_corners(boxes.min(axis=(0,1))[None], boxes.max(axis=(0,1))[None], axis)
+
+
+# Reducers turning a (K,8,3) stack of slab boxes laid out along axis into one (8,3) box
+COLLAPSE_REDUCERS = {
+    "AVG": lambda boxes, axis: boxes.mean(axis=0),
+    "MIN": lambda boxes, axis: boxes[box_volumes(boxes).argmin()].copy(),
+    "MEDIAN": lambda boxes, axis: np.median(boxes, axis=0),
+    "WAVG": _weighted_box,
+    "UNION": _union_box,
+}
+
+
+def collapse_bb(verts, params):
+    """Collapse (8K,3) slab box corners into one box with the params.collapse reducer"""
+    reducer = COLLAPSE_REDUCERS.get(params.collapse)
+    if(len(verts) < 8 or reducer is None):
+        return np.empty((0,3))
+
+    box = reducer(np.asarray(verts, dtype=np.float64).reshape(-1,8,3), params.axis)
+
+    axis = AXIS_INDEX.get(params.axis)
+    if(axis is not None and params.force_vol):
+        box[:4,axis] = verts[:,axis].min()
+        box[4:,axis] = verts[:,axis].max()
+    return box
+
+
+def slab_boxes(coords, params, report=None, profile=NULL_PROFILER):
+    """Box corners of the slab (BOUND) modes for one (N,3) vertex array"""
+    with profile.phase("slab binning", len(coords)):
+        verts = divide_mesh(coords, params, report)
+    if(params.collapse != "NON"):
+        with profile.phase("collapse", len(verts) // 8):
+            verts = collapse_bb(verts, params)
+    return verts
+
+
+def streamed_slab_boxes(read_chunks, params, report=None):
+    """slab_boxes fed by vertex chunks, see divide_mesh_streamed"""
+    verts = divide_mesh_streamed(read_chunks, params, report)
+    if(params.collapse != "NON"):
+        verts = collapse_bb(verts, params)
+    return verts
+
+
+def _cell_keys(vox, levels, depth):
+    """Linear keys of the cells holding (N,3) voxels at per-axis (N,3) levels"""
+    cells = (vox >> (depth - levels)) << 4 | levels
+    bits = depth + 4
+    return (cells[:,0] << (2 * bits)) | (cells[:,1] << bits) | cells[:,2]
+
+
+def octree_boxes(coords, params, report=None, profile=NULL_PROFILER):
+    """Corners of the leaf boxes of an adaptive octree over coords (OCTREE)
+
+    Vertices are binned once into a 2**octree_depth voxel grid. A cell is split
+    when the tight box of its vertices exceeds the volume of the voxels they
+    occupy by more than octree_threshold percent, and only if every child
+    keeps at least two vertices so no geometry is dropped. Cells are halved
+    along their long axes only, so thin parts do not spend boxes on splits
+    across their thickness. Splits with the most excess go first until
+    max_boxes is reached.
+    """
+    if(len(coords) < 2):
+        _report(report, EMPTY_BOX_MSG)
+        return np.empty((0,3))
+
+    depth = params.octree_depth
+    res = 1 << depth
+    lo = coords.min(axis=0).astype(np.float64)
+    extent = coords.max(axis=0) - lo
+    # Flat axes get a nominal voxel thickness so planar meshes still split
+    voxel = np.where(extent > 0, extent, extent.max() or 1.0) / res
+    vox = np.minimum(((coords - lo) / np.where(extent > 0, extent, 1.0) * res).astype(np.int64), res - 1)
+    threshold = params.octree_threshold / 100
+
+    # The tree is built over occupied voxels carrying their vertex count and
+    # bounds, never over the raw vertices again
+    with profile.phase("voxel binning", len(coords)):
+        fine = _cell_keys(vox, np.full_like(vox, depth), depth)
+        order = np.argsort(fine, kind='stable')
+        fine = fine[order]
+        starts = np.flatnonzero(np.concatenate(([True], fine[1:] != fine[:-1])))
+        voxels = vox[order[starts]]
+        voxel_count = np.diff(np.append(starts, len(fine)))
+        voxel_min = np.minimum.reduceat(coords[order], starts, axis=0).astype(np.float64)
+        voxel_max = np.maximum.reduceat(coords[order], starts, axis=0).astype(np.float64)
+        del vox, fine, order
+
+    with profile.phase("octree splits", len(voxels)):
+        leaves_min = []
+        leaves_max = []
+        active = np.arange(len(voxels))
+        levels = np.zeros((len(voxels),3), dtype=np.int64)
+        boxes = 1
+        while(len(active)):
+            cells = _cell_keys(voxels[active], levels, depth)
+            order = np.argsort(cells, kind='stable')
+            active = active[order]
+            levels = levels[order]
+            cells = cells[order]
+            starts = np.flatnonzero(np.concatenate(([True], cells[1:] != cells[:-1])))
+            occupied = np.diff(np.append(starts, len(cells)))
+            bb_min = np.minimum.reduceat(voxel_min[active], starts, axis=0)
+            bb_max = np.maximum.reduceat(voxel_max[active], starts, axis=0)
+            size = np.maximum(bb_max - bb_min, voxel)
+            excess = 1 - occupied * np.prod(voxel) / np.prod(size, axis=1)
+
+            halve = (size >= 0.5 * size.max(axis=1, keepdims=True)) & (levels[starts] < depth)
+            child_levels = levels + np.repeat(halve, occupied, axis=0)
+            child = _cell_keys(voxels[active], child_levels, depth)
+            child_order = np.lexsort((child, np.repeat(np.arange(len(starts)), occupied)))
+            child = child[child_order]
+            child_starts = np.flatnonzero(np.concatenate(([True], child[1:] != child[:-1])))
+            child_counts = np.add.reduceat(voxel_count[active[child_order]], child_starts)
+            first_child = np.searchsorted(child_starts, starts)
+            n_children = np.diff(np.append(first_child, len(child_starts)))
+            min_child = np.minimum.reduceat(child_counts, first_child)
+
+            candidates = np.flatnonzero((excess > threshold) & (n_children > 1) & (min_child >= 2))
+            candidates = candidates[np.argsort(-excess[candidates], kind='stable')]
+            added = np.cumsum(n_children[candidates] - 1)
+            candidates = candidates[boxes + added <= params.max_boxes]
+            boxes += int(n_children[candidates].sum() - len(candidates))
+
+            split = np.zeros(len(starts), dtype=bool)
+            split[candidates] = True
+            leaves_min.append(bb_min[~split])
+            leaves_max.append(bb_max[~split])
+            keep = np.repeat(split, occupied)
+            active = active[keep]
+            levels = child_levels[keep]
+
+    return box_corners(np.concatenate(leaves_min), np.concatenate(leaves_max), "OCTREE")
+
+
+def box_faces(verts):
+    """(6K,4) quads skinning every box of an (8K,3) CUBE_VERTICES corner array"""
+    offsets = 8 * np.arange(len(verts) // 8)[:,None,None]
+    return (offsets + np.array(CUBE_INDICES)).reshape(-1,4)
+
+
+def slab_pyramid(coords, params, levels, factor, report=None):
+    """Slab box corners of up to levels resolutions, finest first, from one binning
+
+    Level k holds the min/max merge of every factor**k consecutive finest
+    slabs. Levels stop once a single slab is left. Collapse is not applied.
+    """
+    axis = AXIS_INDEX.get(params.axis)
+    if(axis is None or len(coords) < 2):
+        return [bounding_box_verts(coords, params, report)]
+
+    values = coords[:,axis]
+    lo = float(values.min())
+    layout = slab_layout(lo, float(values.max()), params, report)
+    if(layout is None):
+        return [bounding_box_verts(coords, params, report)]
+
+    div, chunk = layout
+    slabs, slab_counts, slab_min, slab_max = bin_slabs(coords, axis, slab_edges(lo, div, chunk, params.offset), params.force_vol)
+    counts = np.zeros(div, dtype=np.int64)
+    bb_min = np.full((div,3), np.inf)
+    bb_max = np.full((div,3), -np.inf)
+    counts[slabs] = slab_counts
+    bb_min[slabs] = slab_min
+    bb_max[slabs] = slab_max
+
+    pyramid = []
+    for level in range(levels):
+        filled = np.flatnonzero(counts)
+        pyramid.append(slab_bb_verts(filled, counts[filled], bb_min[filled], bb_max[filled], len(counts), params,
+                                     report if level == 0 else None))
+        if(len(counts) == 1):
+            break
+        groups = np.arange(0, len(counts), factor)
+        counts = np.add.reduceat(counts, groups)
+        bb_min = np.minimum.reduceat(bb_min, groups, axis=0)
+        bb_max = np.maximum.reduceat(bb_max, groups, axis=0)
+    return pyramid
+
+
+def box_layout(axis):
+    """Key of BOX_CORNERS describing the corner order of boxes made for axis"""
+    return axis if axis in AXIS_INDEX else "OCTREE"
+
+
+def box_edges(layout):
+    """(12,2) corner index pairs of the edges of one box in BOX_CORNERS[layout]"""
+    picks = np.array(BOX_CORNERS[layout])
+    i, j = np.triu_indices(8, 1)
+    return np.column_stack((i, j))[np.abs(picks[i] - picks[j]).sum(axis=1) == 1]
+
+
+def _matrix_quaternions(rot):
+    """(K,4) unit (w,x,y,z) quaternions of (K,3,3) rotation matrices"""
+    m = rot
+    trace = m[:,0,0] + m[:,1,1] + m[:,2,2]
+    # Each candidate is accurate where its square root term is large
+    cand = np.stack((
+        np.stack((1 + trace, m[:,2,1] - m[:,1,2], m[:,0,2] - m[:,2,0], m[:,1,0] - m[:,0,1]), axis=1),
+        np.stack((m[:,2,1] - m[:,1,2], 1 + m[:,0,0] - m[:,1,1] - m[:,2,2], m[:,0,1] + m[:,1,0], m[:,0,2] + m[:,2,0]), axis=1),
+        np.stack((m[:,0,2] - m[:,2,0], m[:,0,1] + m[:,1,0], 1 - m[:,0,0] + m[:,1,1] - m[:,2,2], m[:,1,2] + m[:,2,1]), axis=1),
+        np.stack((m[:,1,0] - m[:,0,1], m[:,0,2] + m[:,2,0], m[:,1,2] + m[:,2,1], 1 - m[:,0,0] - m[:,1,1] + m[:,2,2]), axis=1),
+    ), axis=1)
+    pick = np.stack((trace, m[:,0,0], m[:,1,1], m[:,2,2]), axis=1).argmax(axis=1)
+    quat = cand[np.arange(len(m)), pick]
+    quat /= np.linalg.norm(quat, axis=1)[:,None]
+    quat *= np.where(quat[:,:1] < 0, -1, 1)
+    return quat
+
+
+def box_primitives(verts, layout):
+    """BOX_DTYPE records of (8K,3) box corners ordered as BOX_CORNERS[layout]
+
+    The box axes are read from the three edges leaving the first corner, so
+    slab and octree boxes come out unrotated and oriented boxes keep their
+    basis. Axes of flat boxes are completed to a right handed frame.
+    """
+    boxes = np.asarray(verts, dtype=np.float64).reshape(-1,8,3)
+    picks = BOX_CORNERS[layout]
+    origin = boxes[:, picks.index((0,0,0))]
+    edges = np.stack([boxes[:, picks.index(p)] - origin for p in ((1,0,0),(0,1,0),(0,0,1))], axis=1)
+    lengths = np.linalg.norm(edges, axis=2)
+
+    flat = lengths <= 1e-12
+    axes = np.where(flat[...,None], 0.0, edges / np.where(flat, 1.0, lengths)[...,None])
+    for k in range(3):
+        a, b = (k + 1) % 3, (k + 2) % 3
+        fix = flat[:,k] & ~flat[:,a] & ~flat[:,b]
+        axes[fix,k] = np.cross(axes[fix,a], axes[fix,b])
+    axes[flat.sum(axis=1) > 1] = np.identity(3)
+    # Mirrored layouts give a left handed frame, a box is symmetric so flip one axis
+    axes[np.linalg.det(axes) < 0, 2] *= -1
+
+    records = np.empty(len(boxes), dtype=BOX_DTYPE)
+    records["center"] = origin + edges.sum(axis=1) / 2
+    records["half_extents"] = lengths / 2
+    records["rotation"] = _matrix_quaternions(np.transpose(axes, (0,2,1)))
+    return records
+
+
+def make_faces(verts):
+    """(F,4) quads skinning boxes stacked along the slab axis, capped at both ends"""
+    rings = 2 * (len(verts) // 8) - 1
+    sides = 4 * np.arange(rings)[:,None,None] + np.array(SLAB_SIDE_QUADS)
+    top = len(verts) - 1
+    caps = np.array([(0,3,2,1),(top-3,top-2,top-1,top)])
+    return np.concatenate((sides.reshape(-1,4), caps))
+
+
+def _polygon_hull(points, origin, normal):
+    """Indices of the 2D convex hull of coplanar points, counter clockwise about normal"""
+    u = points[np.argmax(np.linalg.norm(points - origin, axis=1))] - origin
+    u /= np.linalg.norm(u)
+    v = np.cross(normal, u)
+    flat = np.column_stack(((points - origin).dot(u), (points - origin).dot(v)))
+    order = np.lexsort((flat[:,1], flat[:,0]))
+
+    def half(indices):
+        chain = []
+        for i in indices:
+            while(len(chain) > 1):
+                a, b = flat[chain[-2]], flat[chain[-1]]
+                if((b[0] - a[0]) * (flat[i,1] - a[1]) - (b[1] - a[1]) * (flat[i,0] - a[0]) > 0):
+                    break
+                chain.pop()
+            chain.append(i)
+        return chain[:-1]
+    return np.array(half(order) + half(order[::-1]))
+
+
+def convex_hull(points):
+    """Vertices and outward (F,3) triangles of the convex hull of (N,3) points
+
+    Incremental quickhull: faces keep the points outside them, the furthest
+    one replaces every face it can see, and the freed points are reassigned
+    to the new faces in one vectorized step. Only hull vertices are returned.
+    Coplanar input gives a single polygon face and collinear input its two
+    end points without faces.
+    """
+    pts = np.unique(np.asarray(points, dtype=np.float64).reshape(-1,3), axis=0)
+    if(len(pts) < 3):
+        return pts, np.empty((0,3), dtype=np.int64)
+    eps = 1e-9 * max(float(np.ptp(pts, axis=0).max()), 1e-30) * max(float(np.abs(pts).max()), 1.0)
+
+    extremes = np.concatenate((pts.argmin(axis=0), pts.argmax(axis=0)))
+    pair = pts[extremes][:,None] - pts[extremes][None]
+    i, j = np.unravel_index(np.einsum('ijk,ijk->ij', pair, pair).argmax(), pair.shape[:2])
+    a, b = extremes[i], extremes[j]
+    line = (pts[b] - pts[a]) / np.linalg.norm(pts[b] - pts[a])
+    off = pts - pts[a]
+    c = int(np.linalg.norm(off - np.outer(off.dot(line), line), axis=1).argmax())
+    normal = np.cross(pts[b] - pts[a], pts[c] - pts[a])
+    if(np.linalg.norm(normal) <= eps):
+        return pts[[a, b]], np.empty((0,3), dtype=np.int64)
+    normal /= np.linalg.norm(normal)
+    height = off.dot(normal)
+    d = int(np.abs(height).argmax())
+    if(abs(height[d]) <= eps):
+        ring = _polygon_hull(pts, pts[a], normal)
+        return pts[ring], np.arange(len(ring))[None]
+
+    # Directed edge -> face, face -> (corners, unit normal, offset, outside points)
+    edges = {}
+    faces = {}
+    next_id = [0]
+
+    def add_faces(corners):
+        tri = pts[np.array(corners)]
+        normals = np.cross(tri[:,1] - tri[:,0], tri[:,2] - tri[:,0])
+        normals /= np.linalg.norm(normals, axis=1)[:,None]
+        offsets = np.einsum('ij,ij->i', normals, tri[:,0])
+        fids = list(range(next_id[0], next_id[0] + len(corners)))
+        next_id[0] += len(corners)
+        for fid, (i, j, k), n, offset in zip(fids, corners, normals, offsets):
+            faces[fid] = [(i, j, k), n, offset, None]
+            edges[(i, j)] = edges[(j, k)] = edges[(k, i)] = fid
+        return fids
+
+    def assign(candidates, fids):
+        """Hand every candidate point to the new face it is furthest outside of"""
+        if(len(candidates) == 0):
+            return
+        normals = np.array([faces[f][1] for f in fids])
+        offsets = np.array([faces[f][2] for f in fids])
+        dist = pts[candidates].dot(normals.T) - offsets
+        best = dist.argmax(axis=1)
+        outside = dist[np.arange(len(candidates)), best] > eps
+        best = best[outside]
+        order = np.argsort(best, kind='stable')
+        groups = np.split(candidates[outside][order], np.searchsorted(best[order], np.arange(1, len(fids))))
+        for fid, mine in zip(fids, groups):
+            faces[fid][3] = mine if len(mine) else None
+
+    tet = (a, b, c) if height[d] < 0 else (a, c, b)
+    first = add_faces([tet] + [(j, i, d) for i, j in ((tet[0], tet[1]), (tet[1], tet[2]), (tet[2], tet[0]))])
+    assign(np.setdiff1d(np.arange(len(pts)), (a, b, c, d)), first)
+
+    pending = list(first)
+    while(pending):
+        fid = pending.pop()
+        face = faces.get(fid)
+        if(face is None or face[3] is None):
+            continue
+        outside = face[3]
+        apex = int(outside[(pts[outside].dot(face[1]) - face[2]).argmax()])
+
+        visible = {fid}
+        stack = [fid]
+        horizon = []
+        while(stack):
+            corners = faces[stack.pop()][0]
+            for i, j in ((corners[0], corners[1]), (corners[1], corners[2]), (corners[2], corners[0])):
+                twin = edges[(j, i)]
+                if(twin in visible):
+                    continue
+                if(pts[apex].dot(faces[twin][1]) - faces[twin][2] > eps):
+                    visible.add(twin)
+                    stack.append(twin)
+                else:
+                    horizon.append((i, j))
+
+        freed = [faces[v][3] for v in visible if faces[v][3] is not None]
+        for v in visible:
+            corners = faces.pop(v)[0]
+            for i, j in ((corners[0], corners[1]), (corners[1], corners[2]), (corners[2], corners[0])):
+                if(edges.get((i, j)) == v):
+                    del edges[(i, j)]
+        new = add_faces([(i, j, apex) for i, j in horizon])
+        freed = np.concatenate(freed)
+        assign(freed[freed != apex], new)
+        pending.extend(new)
+
+    tris = np.array([face[0] for face in faces.values()], dtype=np.int64)
+    used, tris = np.unique(tris, return_inverse=True)
+    return pts[used], tris.reshape(-1,3)
+
+
+def hull_bases(points, triangles):
+    """(B,3,3) candidate box bases, one per edge of every hull triangle
+
+    Each basis holds the edge direction, its in-plane co-tangent and the face
+    normal as rows. Degenerate triangles are skipped.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1,3)
+    tri = np.asarray(points, dtype=np.float64)[triangles]
+    normals = np.cross(tri[:,1] - tri[:,0], tri[:,2] - tri[:,0])
+    lengths = np.linalg.norm(normals, axis=1)
+    keep = lengths > 1e-12
+    tri = tri[keep]
+    normals = normals[keep] / lengths[keep,None]
+
+    edges = tri - np.roll(tri, -1, axis=1)
+    edges /= np.linalg.norm(edges, axis=2, keepdims=True)
+    normals = np.repeat(normals[:,None], 3, axis=1)
+    co_tangents = np.cross(normals, edges)
+    return np.stack((edges, co_tangents, normals), axis=2).reshape(-1,3,3)
+
+
+def unique_bases(bases, tol=1e-6):
+    """Drop bases spanning the same box axes as an earlier one, keeping order
+
+    Two bases give the same box when their rows match up to sign and order,
+    which is common on hulls with coplanar triangles.
+    """
+    bases = np.asarray(bases, dtype=np.float64).reshape(-1,3,3)
+    if(len(bases) < 2):
+        return bases
+    pivot = np.abs(bases).argmax(axis=2)[...,None]
+    keys = np.round(bases * np.sign(np.take_along_axis(bases, pivot, axis=2)) / tol).astype(np.int64)
+    rows = keys.reshape(-1,3)
+    order = np.lexsort((rows[:,2], rows[:,1], rows[:,0], np.repeat(np.arange(len(bases)), 3)))
+    _, first = np.unique(rows[order].reshape(len(bases),9), axis=0, return_index=True)
+    return bases[np.sort(first)]
+
+
+def rotating_calipers(verts, bases, chunk_bytes=CALIPER_CHUNK_BYTES):
+    """Basis, max and min of the smallest box around verts over all bases
+
+    Bases are orthonormal, so points are projected onto their rows instead of
+    multiplied by the inverse. Bases are evaluated in stacks sized so the
+    projected points stay within chunk_bytes.
+    """
+    verts = np.asarray(verts, dtype=np.float64)
+    bases = unique_bases(bases)
+    step = max(1, chunk_bytes // max(1, verts.nbytes))
+
+    min_bb_basis = None
+    min_bb_min = None
+    min_bb_max = None
+    min_vol = math.inf
+    for start in range(0, len(bases), step):
+        chunk = bases[start:start + step]
+        rot_points = np.einsum('nj,bkj->nbk', verts, chunk, optimize=True)
+
+        bb_min = rot_points.min(axis=0)
+        bb_max = rot_points.max(axis=0)
+        volume = (bb_max - bb_min).prod(axis=1)
+        i = int(volume.argmin())
+        if volume[i] < min_vol:
+            min_bb_basis = chunk[i]
+            min_vol = volume[i]
+
+            min_bb_min = bb_min[i]
+            min_bb_max = bb_max[i]
+
+    return np.array(min_bb_basis),min_bb_max,min_bb_min
+
+
+def oriented_box_verts(bb_basis, bb_min, bb_max):
+    """(8,3) world corners of the box bb_min..bb_max expressed in bb_basis rows"""
+    bb_center = (bb_max + bb_min) / 2
+    bb_half = (bb_max - bb_min) / 2
+    return (bb_center + np.array(CUBE_VERTICES) * bb_half).dot(bb_basis)
+
+
+def min_oriented_box(points, triangles, profile=NULL_PROFILER):
+    """Corners of the minimum volume box of a convex hull (MIN_AXIS)
+
+    triangles index the hull faces into points; only hull vertices are used.
+    Falls back to the axis aligned box when the hull has no usable faces.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if(len(points) == 0):
+        return np.empty((0,3))
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1,3)
+    hull_pts = points[np.unique(triangles)] if len(triangles) else points
+    with profile.phase("candidate bases", len(triangles)):
+        bases = hull_bases(points, triangles)
+    if(len(bases) == 0):
+        bases = np.identity(3)[None]
+
+    with profile.phase("rotating calipers", len(bases)):
+        bb_basis, bb_max, bb_min = rotating_calipers(hull_pts, bases)
+    return oriented_box_verts(bb_basis, bb_min, bb_max)
+
+
+def hull_volume(points, triangles):
+    """Volume enclosed by a closed triangle hull"""
+    tri = np.asarray(points, dtype=np.float64)[np.asarray(triangles, dtype=np.int64).reshape(-1,3)]
+    tri = tri - tri.reshape(-1,3).mean(axis=0)
+    return abs(np.einsum('ij,ij->i', tri[:,0], np.cross(tri[:,1], tri[:,2])).sum()) / 6
+
+
+def pca_basis(points):
+    """Right handed basis of the principal axes of points, major axis first"""
+    centered = points - points.mean(axis=0)
+    _, vecs = np.linalg.eigh(centered.T.dot(centered))
+    basis = vecs.T[::-1].copy()
+    if(np.linalg.det(basis) < 0):
+        basis[2] *= -1
+    return basis
+
+
+def dito_bases(points, directions):
+    """Candidate bases and a volume lower bound from a DiTO ditetrahedron
+
+    The extremal points along directions give a large base triangle, and the
+    points furthest above and below it two apexes. Every face of the
+    resulting ditetrahedron contributes its edge bases, and its volume bounds
+    any enclosing box from below.
+    """
+    proj = points.dot(directions.T)
+    d = len(directions)
+    ext = points[np.concatenate((proj.argmin(axis=0), proj.argmax(axis=0)))]
+
+    k = int(np.linalg.norm(ext[d:] - ext[:d], axis=1).argmax())
+    p0, p1 = ext[k], ext[d + k]
+    line = p1 - p0
+    if(not np.any(line)):
+        return np.empty((0,3,3)), 0.0
+    line = line / np.linalg.norm(line)
+    off = ext - p0
+    p2 = ext[np.linalg.norm(off - np.outer(off.dot(line), line), axis=1).argmax()]
+
+    normal = np.cross(p1 - p0, p2 - p0)
+    area = np.linalg.norm(normal) / 2
+    if(area == 0):
+        return np.empty((0,3,3)), 0.0
+    height = (points - p0).dot(normal / (2 * area))
+    q0, q1 = points[height.argmin()], points[height.argmax()]
+
+    tris = [(p0,p1,p2)]
+    for q in (q0, q1):
+        tris.extend([(p0,p1,q), (p1,p2,q), (p2,p0,q)])
+    tris = np.array(tris)
+    bases = hull_bases(tris.reshape(-1,3), np.arange(len(tris) * 3).reshape(-1,3))
+    return bases, area * (height.max() - height.min()) / 3
+
+
+def fast_oriented_box(points, tolerance=0.0, triangles=None, profile=NULL_PROFILER):
+    """Corners of a near minimal box from PCA and DiTO candidate axes (FAST_AXIS)
+
+    Candidate groups are evaluated from cheapest to richest, stopping once the
+    best volume is within tolerance (a fraction) of the known lower bound.
+    With hull triangles the fit only uses hull vertices and the hull volume
+    tightens the bound.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if(len(points) == 0):
+        return np.empty((0,3))
+
+    lower = 0.0
+    if(triangles is not None and len(triangles)):
+        lower = hull_volume(points, triangles)
+        points = points[np.unique(np.asarray(triangles, dtype=np.int64))]
+
+    with profile.phase("candidate bases", len(points)):
+        pca = pca_basis(points)
+        dito, dito_lower = dito_bases(points, np.concatenate((DITO_DIRECTIONS, pca)))
+    lower = max(lower, dito_lower)
+    groups = (pca[None], np.identity(3)[None], dito[:3], dito[3:])
+
+    min_vol = math.inf
+    for bases in groups:
+        if(len(bases) == 0):
+            continue
+        with profile.phase("rotating calipers", len(bases)):
+            basis, bb_max, bb_min = rotating_calipers(points, bases)
+        volume = (bb_max - bb_min).prod()
+        if(volume < min_vol):
+            min_vol = volume
+            best = basis, bb_min, bb_max
+        if(min_vol <= lower * (1 + tolerance)):
+            break
+
+    return oriented_box_verts(*best)
+
+
+def cluster_decimate(coords, triangles, ratio, iterations=6, report=None):
+    """Vertex clustering decimation of a triangle mesh to about ratio of its vertices
+
+    Vertices are snapped to a uniform grid and every occupied cell becomes
+    one vertex at the mean of its members. The cell size starts from the
+    surface area per target vertex and is rescaled until the vertex count is
+    within 10% of the target. A grid so coarse that every triangle collapses
+    is never used, the cells shrink again until faces survive. Triangles
+    collapsing to an edge or a point and duplicates are dropped. Returns the
+    new (M,3) vertices and (T,3) triangles.
+    """
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1,3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1,3)
+    target = max(4, int(len(coords) * ratio))
+    if(len(coords) <= target):
+        return coords, triangles
+
+    lo = coords.min(axis=0)
+    extent = np.ptp(coords, axis=0)
+    if(not np.any(extent)):
+        return coords[:1], np.empty((0,3), dtype=np.int64)
+    tri = coords[triangles]
+    area = np.linalg.norm(np.cross(tri[:,1] - tri[:,0], tri[:,2] - tri[:,0]), axis=1).sum() / 2
+    cell = math.sqrt(area / target) if area > 0 else float(np.ptp(coords, axis=0).max()) / target ** (1 / 3)
+    finest = float(extent.max()) / 2**20
+
+    cluster = counts = tris = None
+    step = 0
+    while(step < iterations):
+        cell = max(cell, finest)
+        grid = ((coords - lo) / cell).astype(np.int64)
+        keys = (grid[:,0] << 42) | (grid[:,1] << 21) | grid[:,2]
+        _, found, found_counts = np.unique(keys, return_inverse=True, return_counts=True)
+        found = found.ravel()
+        found_tris = found[triangles]
+        found_tris = found_tris[(found_tris[:,0] != found_tris[:,1]) & (found_tris[:,1] != found_tris[:,2])
+                                & (found_tris[:,2] != found_tris[:,0])]
+        if(len(triangles) and len(found_tris) == 0):
+            # Every triangle collapsed: keep the last grid with faces, or
+            # refine until one has them
+            if(cluster is not None or cell <= finest):
+                break
+            cell /= 2
+            continue
+        cluster, counts, tris = found, found_counts, found_tris
+        step += 1
+        if(abs(len(counts) - target) <= 0.1 * target):
+            break
+        cell *= math.sqrt(len(counts) / target)
+
+    if(cluster is None):
+        _report(report, EMPTY_DECIMATE_MSG)
+        return np.empty((0,3)), np.empty((0,3), dtype=np.int64)
+
+    verts = np.stack([np.bincount(cluster, weights=coords[:,k]) for k in range(3)], axis=1) / counts[:,None]
+    corners = np.sort(tris, axis=1)
+    order = np.lexsort(corners.T[::-1])
+    repeated = np.all(corners[order[1:]] == corners[order[:-1]], axis=1)
+    tris = tris[np.sort(order[np.concatenate(([True], ~repeated))[:len(order)]])]
+
+    if(len(triangles) == 0):
+        # Loose vertices, the cluster centres are the result
+        return verts, tris
+    used, tris = np.unique(tris, return_inverse=True)
+    return verts[used], tris.reshape(-1,3)
+
+
+def _surface_samples(coords, triangles, spacing):
+    """coords plus points spread over the triangles about spacing apart"""
+    if(triangles is None or len(triangles) == 0):
+        return coords
+    tri = coords[np.asarray(triangles, dtype=np.int64).reshape(-1,3)]
+    area = np.linalg.norm(np.cross(tri[:,1] - tri[:,0], tri[:,2] - tri[:,0]), axis=1) / 2
+    counts = np.floor(area / (spacing * spacing / 2)).astype(np.int64)
+    if(counts.sum() > ACD_MAX_SAMPLES):
+        counts = np.floor(counts * (ACD_MAX_SAMPLES / counts.sum())).astype(np.int64)
+    owner = np.repeat(np.arange(len(tri)), counts)
+
+    # Fixed seed, the same mesh always gives the same decomposition
+    rng = np.random.default_rng(0)
+    r1 = np.sqrt(rng.random(len(owner)))[:,None]
+    r2 = rng.random(len(owner))[:,None]
+    t = tri[owner]
+    samples = (1 - r1) * t[:,0] + r1 * (1 - r2) * t[:,1] + r1 * r2 * t[:,2]
+    return np.concatenate((coords, samples))
+
+
+def _solid_voxels(voxels, dims):
+    """(N,3) voxels inside or on the surface given by the occupied voxels
+
+    Empty space is flood filled from the border of a padded grid; whatever
+    it cannot reach is solid.
+    """
+    surface = np.zeros(dims + 2, dtype=bool)
+    surface[tuple((voxels + 1).T)] = True
+    outside = np.zeros_like(surface)
+    outside[0,:,:] = outside[-1,:,:] = outside[:,0,:] = outside[:,-1,:] = outside[:,:,0] = outside[:,:,-1] = True
+    outside &= ~surface
+    while(True):
+        grown = outside.copy()
+        grown[1:] |= outside[:-1]
+        grown[:-1] |= outside[1:]
+        grown[:,1:] |= outside[:,:-1]
+        grown[:,:-1] |= outside[:,1:]
+        grown[:,:,1:] |= outside[:,:,:-1]
+        grown[:,:,:-1] |= outside[:,:,1:]
+        grown &= ~surface
+        if(np.array_equal(grown, outside)):
+            break
+        outside = grown
+    return np.argwhere(~outside[1:-1,1:-1,1:-1])
+
+
+def _dop_cells(lo, hi):
+    """Grid cells inside the 26-DOP with per direction bounds lo..hi
+
+    The DOP constraints bound z linearly in every (x,y) column, so the cells
+    are counted per column instead of enumerated.
+    """
+    x, y = np.meshgrid(np.arange(lo[0], hi[0] + 1), np.arange(lo[1], hi[1] + 1), indexing='ij')
+    x = x.ravel()
+    y = y.ravel()
+    z_lo = np.full(len(x), lo[2])
+    z_hi = np.full(len(x), hi[2])
+    inside = np.ones(len(x), dtype=bool)
+    for k in range(3, len(DOP_DIRECTIONS)):
+        dx, dy, dz = DOP_DIRECTIONS[k]
+        base = dx * x + dy * y
+        if(dz == 0):
+            inside &= (base >= lo[k]) & (base <= hi[k])
+        elif(dz > 0):
+            np.maximum(z_lo, lo[k] - base, out=z_lo)
+            np.minimum(z_hi, hi[k] - base, out=z_hi)
+        else:
+            np.maximum(z_lo, base - hi[k], out=z_lo)
+            np.minimum(z_hi, base - lo[k], out=z_hi)
+    return int(np.where(inside, np.maximum(z_hi - z_lo + 1, 0), 0).sum())
+
+
+def _dop_excess(cells):
+    """Grid cells inside the 26-DOP of cells that cells do not fill"""
+    proj = cells.dot(DOP_DIRECTIONS.T)
+    return _dop_cells(proj.min(axis=0), proj.max(axis=0)) - len(cells)
+
+
+def _best_split(cells):
+    """(gain, axis, position) of the axis plane that most reduces DOP excess
+
+    DOP bounds of every left and right side come from prefix and suffix
+    min/max over the per slice bounds, the cells are projected only once.
+    """
+    proj = cells.dot(DOP_DIRECTIONS.T)
+    excess = _dop_cells(proj.min(axis=0), proj.max(axis=0)) - len(cells)
+    best = (0, None, None)
+    for axis in range(3):
+        values = proj[:,axis]
+        lo, hi = int(values.min()), int(values.max())
+        if(hi == lo):
+            continue
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+        slice_min = np.minimum.reduceat(proj[order], starts, axis=0)
+        slice_max = np.maximum.reduceat(proj[order], starts, axis=0)
+        left_min = np.minimum.accumulate(slice_min)
+        left_max = np.maximum.accumulate(slice_max)
+        right_min = np.minimum.accumulate(slice_min[::-1])[::-1]
+        right_max = np.maximum.accumulate(slice_max[::-1])[::-1]
+
+        slice_values = sorted_values[starts]
+        for position in np.unique(np.linspace(lo + 1, hi, min(ACD_PLANES, hi - lo)).astype(np.int64)):
+            # Slices left of the plane end at k, the right side starts at k+1
+            k = int(np.searchsorted(slice_values, position)) - 1
+            if(k < 0 or k + 1 >= len(starts)):
+                continue
+            split = (_dop_cells(left_min[k], left_max[k]) + _dop_cells(right_min[k + 1], right_max[k + 1])
+                     - len(cells))
+            gain = excess - split
+            if(gain > best[0]):
+                best = (gain, axis, int(position))
+    return best
+
+
+def _fibonacci_directions(count):
+    i = np.arange(count) + 0.5
+    z = 1 - 2 * i / count
+    r = np.sqrt(1 - z * z)
+    phi = math.pi * (1 + math.sqrt(5)) * i
+    return np.column_stack((r * np.cos(phi), r * np.sin(phi), z))
+
+
+def _budget_hull(points, max_verts):
+    """Hull through at most max_verts of the points extreme along spread directions"""
+    best = None
+    count = max_verts
+    # More directions find more distinct extremes, keep the richest hull in budget
+    for _ in range(6):
+        support = np.unique(points.dot(_fibonacci_directions(count).T).argmax(axis=0))
+        hull = convex_hull(points[support])
+        if(len(hull[0]) > max_verts):
+            if(best is None):
+                count = max(4, count // 2)
+                continue
+            break
+        if(best is not None and len(hull[0]) == len(best[0])):
+            break
+        best = hull
+        count *= 2
+    verts, faces = best if best is not None else convex_hull(points[support[:max_verts]])
+    if(faces.shape[1] != 3):
+        # Flat part, fan the single polygon into triangles
+        ring = faces[0]
+        faces = np.column_stack((np.full(len(ring) - 2, ring[0]), ring[1:-1], ring[2:]))
+    return verts, faces
+
+
+def convex_decomposition(coords, params, triangles=None, report=None, profile=NULL_PROFILER):
+    """Vertices and (F,3) triangles of a few convex hulls approximating a mesh
+
+    The surface (the vertices plus points spread over triangles) is voxelized
+    at acd_resolution cells along its longest side and flood filled into a
+    solid. Parts are split greedily on the axis plane that most reduces the
+    cells their 26-DOP covers without filling, the biggest reduction first,
+    until acd_max_hulls parts exist or no split reduces the excess by more
+    than acd_concavity percent of the solid. The best splits of a round of
+    parts are searched in a thread pool. Each part becomes the hull of its
+    surface points, reduced to acd_max_verts vertices.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    if(len(coords) < 4):
+        _report(report, EMPTY_BOX_MSG)
+        return np.empty((0,3)), np.empty((0,3), dtype=np.int64)
+
+    lo = coords.min(axis=0)
+    extent = np.ptp(coords, axis=0)
+    size = float(extent.max()) / params.acd_resolution or 1.0
+    dims = np.maximum(np.ceil(extent / size).astype(np.int64), 1)
+
+    with profile.phase("voxelize", len(coords)):
+        points = _surface_samples(coords, triangles, size / 2)
+        voxel = np.minimum(((points - lo) / size).astype(np.int64), dims - 1)
+        cells = _solid_voxels(np.unique(voxel, axis=0), dims)
+
+    limit = params.acd_concavity / 100 * len(cells)
+    parts = [cells]
+    with profile.phase("split parts", len(cells)), ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        frontier = [cells]
+        while(frontier and len(parts) < params.acd_max_hulls):
+            frontier = [part for part in frontier if len(part) > 1 and _dop_excess(part) > limit]
+            splits = list(pool.map(_best_split, frontier))
+            # Convex parts leave some DOP excess that no split removes, only
+            # splits that cut it by more than the concavity limit are taken
+            order = [(-gain, i) for i, (gain, _, _) in enumerate(splits) if gain > limit]
+            heapq.heapify(order)
+            children = []
+            while(order and len(parts) < params.acd_max_hulls):
+                _, i = heapq.heappop(order)
+                _, axis, position = splits[i]
+                part = frontier[i]
+                left = part[:,axis] < position
+                parts = [p for p in parts if p is not part] + [part[left], part[~left]]
+                children += [part[left], part[~left]]
+            frontier = children
+
+    with profile.phase("part hulls", len(parts)):
+        labels = np.full(tuple(dims), -1, dtype=np.int64)
+        for label, part in enumerate(parts):
+            labels[tuple(part.T)] = label
+        owner = labels[tuple(voxel.T)]
+
+        all_verts = []
+        all_faces = []
+        offset = 0
+        for label in range(len(parts)):
+            part_points = points[owner == label]
+            if(len(part_points) < 4):
+                continue
+            verts, faces = _budget_hull(part_points, params.acd_max_verts)
+            if(len(faces) == 0):
+                continue
+            all_verts.append(verts)
+            all_faces.append(faces + offset)
+            offset += len(verts)
+
+    if(not all_verts):
+        _report(report, EMPTY_BOX_MSG)
+        return np.empty((0,3)), np.empty((0,3), dtype=np.int64)
+    return np.concatenate(all_verts), np.concatenate(all_faces)
+
+
+def compute_boxes(coords, params, triangles=None, profile=NULL_PROFILER):
+    """Box corners of one (N,3) vertex array and the messages raised on the way
+
+    triangles are the convex hull faces, required for MIN_AXIS and optional
+    for FAST_AXIS, or the mesh triangles for CONVEX, which returns a
+    (vertices, triangles) pair instead of box corners. profile times the
+    phases, see profiling.PhaseProfiler.
+    """
+    messages = []
+    if(params.axis == "CONVEX"):
+        verts = convex_decomposition(coords, params, triangles, messages.append, profile)
+    elif(params.axis == "MIN_AXIS"):
+        verts = min_oriented_box(coords, [] if triangles is None else triangles, profile)
+    elif(params.axis == "FAST_AXIS"):
+        verts = fast_oriented_box(coords, params.fast_tolerance / 100, triangles, profile)
+    elif(params.axis == "OCTREE"):
+        verts = octree_boxes(coords, params, messages.append, profile)
+    else:
+        verts = slab_boxes(coords, params, messages.append, profile)
+    return verts, messages
+
+
+def _shared_boxes(name, total, start, stop, params, triangles):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        coords = np.ndarray((total,3), dtype=np.float32, buffer=shm.buf)[start:stop]
+        result = compute_boxes(coords, params, triangles)
+        del coords
+    finally:
+        shm.close()
+    return result
+
+
+def parallel_boxes(coords_list, params, triangles_list=None, workers=0):
+    """compute_boxes over many vertex arrays in a process pool
+
+    The arrays are copied once into a shared memory block that workers map
+    instead of unpickling their own copy. Results come back in input order
+    and every array is processed independently, so the output does not
+    depend on the worker count. workers=0 uses every core.
+    """
+    if(triangles_list is None):
+        triangles_list = [None] * len(coords_list)
+    offsets = np.concatenate(([0], np.cumsum([len(c) for c in coords_list]))).tolist()
+    total = offsets[-1]
+    workers = workers or multiprocessing.cpu_count()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total * 3 * 4))
+    buf = None
+    try:
+        buf = np.ndarray((total,3), dtype=np.float32, buffer=shm.buf)
+        for coords, start, stop in zip(coords_list, offsets[:-1], offsets[1:]):
+            buf[start:stop] = coords
+
+        # Never fork the host application (Blender), always start clean workers
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            chunksize = max(1, len(coords_list) // (workers * 4))
+            return list(pool.map(_shared_boxes, repeat(shm.name), repeat(total), offsets[:-1], offsets[1:],
+                                 repeat(params), triangles_list, chunksize=chunksize))
+    finally:
+        del buf
+        shm.close()
+        shm.unlink()
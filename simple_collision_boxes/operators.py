@@ -0,0 +1,1099 @@
+import os
+import ctypes
+import json
+import time
+import bpy
+import bmesh
+import gpu
+import numpy as np
+from bpy.app.handlers import persistent
+from bpy.types import Operator
+from gpu_extras.batch import batch_for_shader
+from bpy_extras.object_utils import AddObjectHelper
+from bpy.props import FloatProperty, IntProperty, EnumProperty, BoolProperty, StringProperty
+
+from . import cache, export, kernel, profiling
+
+ORIENTED_AXES = {"MIN_AXIS", "FAST_AXIS"}
+
+# Settings that do not shape the collision mesh, left out of live link records
+LIVE_IGNORED = ("live_link", "shared_mesh", "parent", "suffix", "use_profiling", "profile_path", "profile_format")
+# Seconds without edits before regenerating, and regeneration time per timer tick
+LIVE_DELAY = 0.3
+LIVE_BUDGET = 0.05
+
+class CollisionBuilder:
+    """Box computation and mesh writing, reading the settings from self
+
+    Shared by the operator and by live regeneration, which replays the
+    settings stored on a collision object without running the operator.
+    """
+
+    def lod_meshes(self,m_object,params,messages):
+        """Collision meshes of every pyramid level of one object"""
+        with self.profiler.phase("read vertices", len(m_object.data.vertices)):
+            coords = self.mesh_coords(m_object.data.vertices)
+        with self.profiler.phase("slab pyramid", len(coords)):
+            pyramid = kernel.slab_pyramid(coords,params,self.lod_levels,self.lod_factor,report=messages.append)
+        return [self.build_mesh(m_object.name + self.lod_suffix + str(level) + "_colmesh",bb_verts)
+                for level,bb_verts in enumerate(pyramid)]
+
+    def compute_boxes(self,context,selection):
+        """Cache key and box corners of every selected object
+
+        Objects sharing a mesh datablock (linked duplicates) share a key and
+        are only computed once, unless the axis is oriented and they have
+        modifiers.
+        """
+        params = kernel.CollisionParams.from_operator(self)
+
+        active_object = bpy.context.view_layer.objects.active
+        if(self.axis not in ORIENTED_AXES and self.shared_mesh and active_object is not None):
+            self.profiler.set_object(active_object.name)
+            with self.profiler.phase("read vertices", len(active_object.data.vertices)):
+                coords = self.mesh_coords(active_object.data.vertices)
+            triangles = None
+            if(self.axis == "CONVEX"):
+                with self.profiler.phase("read triangles", len(active_object.data.polygons)):
+                    triangles = self.mesh_triangles(active_object.data)
+            bb_verts, messages = kernel.compute_boxes(coords,params,triangles,self.profiler)
+            self.report_messages(messages)
+            key = (active_object.data, params)
+            return [(key, bb_verts)] * len(selection)
+
+        # Oriented boxes are fit to the evaluated mesh, linked duplicates only
+        # share it while no modifiers change their geometry
+        oriented = self.axis in ORIENTED_AXES
+        keys = [(m_object if (oriented and m_object.modifiers) else m_object.data, params) for m_object in selection]
+        sources = {}
+        for key,m_object in zip(keys,selection):
+            sources.setdefault(key, m_object)
+
+        box_cache = self.disk_cache()
+        boxes = {}
+        pending = []
+        for key,m_object in sources.items():
+            self.profiler.set_object(m_object.name)
+            if(self.use_streaming and self.axis in kernel.AXIS_INDEX):
+                boxes[key] = self.stream_boxes(m_object,params,box_cache)
+                continue
+
+            coords, triangles, digest, cached = self.object_snapshot(m_object,params,box_cache)
+            if(cached is not None):
+                boxes[key] = cached
+            else:
+                pending.append((key, coords, triangles, digest))
+
+        coords_list = [coords for _,coords,_,_ in pending]
+        triangles_list = [triangles for _,_,triangles,_ in pending]
+        if(self.use_parallel and len(pending) > 1):
+            self.profiler.set_object(None)
+            with self.profiler.phase("parallel kernel", sum(len(coords) for coords in coords_list)):
+                results = kernel.parallel_boxes(coords_list,params,triangles_list,self.workers)
+        else:
+            results = []
+            for (key,coords,triangles,_) in pending:
+                self.profiler.set_object(sources[key].name)
+                results.append(kernel.compute_boxes(coords,params,triangles,self.profiler))
+
+        self.report_messages([message for _,messages in results for message in messages])
+        for (key,_,_,digest),(bb_verts,_) in zip(pending,results):
+            boxes[key] = bb_verts
+            if(box_cache is not None):
+                self.profiler.set_object(sources[key].name)
+                with self.profiler.phase("cache store", len(bb_verts)):
+                    box_cache.store(digest,bb_verts)
+        if(box_cache is not None and pending):
+            box_cache.evict()
+
+        return [(key, boxes[key]) for key in keys]
+
+    def disk_cache(self):
+        if(not self.use_disk_cache):
+            return None
+        return cache.DiskCache(output_path(self.cache_dir,"collision_cache"),self.cache_size * 1024 * 1024)
+
+    def object_snapshot(self,m_object,params,box_cache=None):
+        """Vertex coords, hull triangles, cache key and cached boxes of an object
+
+        The hull is only built when the boxes are not in the cache.
+        """
+        oriented = self.axis in ORIENTED_AXES
+        try:
+            with self.profiler.phase("evaluate mesh" if oriented else "read vertices", len(m_object.data.vertices)):
+                mesh = m_object.to_mesh() if oriented else m_object.data
+                coords = self.mesh_coords(mesh.vertices)
+
+            digest = cached = triangles = None
+            if(self.axis == "CONVEX"):
+                # The decomposition samples the faces, they are part of the key
+                with self.profiler.phase("read triangles", len(mesh.polygons)):
+                    triangles = self.mesh_triangles(mesh)
+            if(box_cache is not None):
+                with self.profiler.phase("cache lookup", len(coords)):
+                    digest = box_cache.key(coords,params,(self.mode, self.covex_mesh, self.fast_hull),triangles)
+                    cached = box_cache.load(digest)
+            if(cached is None and (self.axis == "MIN_AXIS" or (oriented and self.fast_hull))):
+                with self.profiler.phase("convex hull", len(coords)):
+                    triangles = self.hull_triangles(mesh)
+        finally:
+            # Temporary meshes pile up over long batch runs otherwise
+            if(oriented):
+                m_object.to_mesh_clear()
+        return coords, triangles, digest, cached
+
+    def stream_boxes(self,m_object,params,box_cache=None):
+        """Slab boxes of an object read in chunks rather than one full copy"""
+        if(len(m_object.data.vertices) > 1 and self.position_view(m_object.data) is None):
+            self.report({'WARNING'}, "Streaming needs Blender 3.5 or newer, the vertices of %s are copied in full" % m_object.name)
+        read_chunks = self.coord_chunks(m_object.data,self.stream_chunk)
+
+        digest = None
+        if(box_cache is not None):
+            digest = box_cache.stream_key(read_chunks,len(m_object.data.vertices),params,(self.mode, self.covex_mesh, self.fast_hull))
+            cached = box_cache.load(digest)
+            if(cached is not None):
+                return cached
+
+        messages = []
+        with self.profiler.phase("streamed binning", len(m_object.data.vertices)):
+            bb_verts = kernel.streamed_slab_boxes(read_chunks,params,report=messages.append)
+        self.report_messages(messages)
+        if(box_cache is not None):
+            box_cache.store(digest,bb_verts)
+        return bb_verts
+
+    def coord_chunks(self,mesh,chunk_size):
+        """Callable iterating the vertex coords of mesh in chunks of one reused buffer
+
+        Each call maps the positions again and the mapping only lives in that
+        generator, so no view of mesh memory is left once the chunks are read.
+        """
+        count = len(mesh.vertices)
+        buf = np.empty((min(chunk_size, count),3), dtype=np.float32)
+
+        def read_chunks():
+            positions = self.position_view(mesh)
+            if(positions is None):
+                positions = self.mesh_coords(mesh.vertices)
+            for start in range(0, count, chunk_size):
+                chunk = buf[:min(chunk_size, count - start)]
+                np.copyto(chunk, positions[start:start + chunk_size])
+                yield chunk
+        return read_chunks
+
+    def position_view(self,mesh):
+        """(N,3) view of the vertex positions without copying them, or None
+
+        From 3.5 positions live in one contiguous float3 attribute that can be
+        mapped directly. The view aliases Blender's own memory, it must not be
+        kept past anything that can edit or free the mesh.
+        """
+        count = len(mesh.vertices)
+        if(count > 1 and bpy.app.version >= (3, 5, 0)):
+            data = mesh.attributes["position"].data
+            address = data[0].as_pointer()
+            if(data[count - 1].as_pointer() - address == (count - 1) * 12):
+                buffer = (ctypes.c_float * (count * 3)).from_address(address)
+                return np.ctypeslib.as_array(buffer).reshape(-1,3)
+        return None
+
+    def build_mesh(self,name,bb_verts):
+        bb_mesh = bpy.data.meshes.new(name=name)
+
+        if(self.axis == "CONVEX"):
+            hull_verts, hull_faces = bb_verts
+            with self.profiler.phase("mesh build", len(hull_verts)):
+                self.fill_mesh(bb_mesh,hull_verts,hull_faces)
+            return bb_mesh
+
+        if(self.axis in ORIENTED_AXES):
+            faces = kernel.CUBE_INDICES if len(bb_verts) else ()
+            with self.profiler.phase("mesh build", len(bb_verts)):
+                self.fill_mesh(bb_mesh,bb_verts,faces)
+                bb_mesh.validate()
+            bb_mesh["collision_boxes"] = len(bb_verts) // 8
+            return bb_mesh
+
+        if(self.covex_mesh):
+            # Only the hull of the box corners is ever written to the mesh
+            with self.profiler.phase("force convex", len(bb_verts)):
+                bb_verts, faces = self.corner_hull(bb_mesh,bb_verts)
+        else:
+            faces = ()
+            if(self.axis == "OCTREE"):
+                faces = kernel.box_faces(bb_verts)
+            elif(len(bb_verts)>7):
+                faces = kernel.make_faces(bb_verts)
+            # Only meshes that still are boxes carry a count, for batch summaries
+            bb_mesh["collision_boxes"] = len(bb_verts) // 8
+
+        with self.profiler.phase("mesh build", len(bb_verts)):
+            self.fill_mesh(bb_mesh,bb_verts,faces)
+        return bb_mesh
+
+    def mesh_triangles(self,mesh):
+        mesh.calc_loop_triangles()
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", triangles)
+        return triangles.reshape(-1,3)
+
+    def hull_triangles(self,mesh):
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.verts.index_update()
+        bem = bmesh.ops.convex_hull(bm,input=bm.verts,use_existing_faces=False)
+        triangles = [[v.index for v in elem.verts] for elem in bem["geom"]
+                     if isinstance(elem, bmesh.types.BMFace) and len(elem.verts) == 3]
+        bm.free()
+        return triangles
+
+    def corner_hull(self,bb_mesh,bb_verts):
+        """Hull vertices and triangles of box corners, from bmesh's C convex hull
+
+        The corners go into the still empty bb_mesh as loose vertices, so the
+        hull needs no faces or set differences, and bb_mesh is cleared again.
+        Flat corner sets, which bmesh gives no faces for, use kernel.convex_hull.
+        """
+        bb_verts = np.asarray(bb_verts, dtype=np.float32).reshape(-1,3)
+        if(len(bb_verts) < 4):
+            return bb_verts, ()
+        bb_mesh.vertices.add(len(bb_verts))
+        bb_mesh.vertices.foreach_set("co", bb_verts.ravel())
+        triangles = np.array(self.hull_triangles(bb_mesh), dtype=np.int64).reshape(-1,3)
+        bb_mesh.clear_geometry()
+        if(len(triangles) == 0):
+            return kernel.convex_hull(bb_verts)
+        used, triangles = np.unique(triangles, return_inverse=True)
+        return bb_verts[used], triangles.reshape(-1,3)
+
+    def fill_mesh(self,bb_mesh,verts,faces):
+        """Write vertices and same sized faces straight from arrays, edges are derived"""
+        faces = np.asarray(faces, dtype=np.int32)
+        sides = faces.shape[1] if faces.ndim == 2 else 4
+        faces = faces.reshape(-1,sides)
+
+        bb_mesh.vertices.add(len(verts))
+        bb_mesh.vertices.foreach_set("co", np.asarray(verts, dtype=np.float32).ravel())
+        bb_mesh.loops.add(faces.size)
+        bb_mesh.loops.foreach_set("vertex_index", faces.ravel())
+        bb_mesh.polygons.add(len(faces))
+        bb_mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, sides, dtype=np.int32))
+        if(bpy.app.version < (4, 0, 0)):
+            bb_mesh.polygons.foreach_set("loop_total", np.full(len(faces), sides, dtype=np.int32))
+        bb_mesh.update(calc_edges=True)
+
+    def report_messages(self,messages):
+        for message in dict.fromkeys(messages):
+            self.report({'INFO'}, message)
+
+    def mesh_coords(self,vertices):
+        coords = np.empty(len(vertices) * 3, dtype=np.float32)
+        vertices.foreach_get("co", coords)
+        return coords.reshape(-1,3)
+
+class OBJECT_OT_create_collision(Operator, CollisionBuilder):
+    bl_idname = "mesh.create_simple_collision"
+    bl_label = "Create Simplified Collision Mesh"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode : EnumProperty(
+        name='Mode',
+        description="Collision Generation Mode",
+        items=[
+            ("BOUND", "Bounding Box", ""),
+            ("DECIM", "Decimate", ""),
+            ],
+        default="BOUND"
+    )
+
+    decimate_rat : FloatProperty(
+        name='Decimate Ratio',
+        description="Collapse decimate ratio",
+        min=0.0, max=1.0,
+        default=0.5,
+    )
+    decimate_method : EnumProperty(
+        name='Method',
+        description="How the meshes are decimated",
+        items=[
+            ("COLLAPSE", "Collapse", "Decimate modifier, evaluated for all objects at once"),
+            ("CLUSTER", "Vertex Clustering", "Grid clustering in NumPy, fast on very dense meshes"),
+            ],
+        default="COLLAPSE"
+    )
+    axis : EnumProperty(
+        name='Axis',
+        description="Subdivide along Axis",
+        items=[
+            ("X_AXIS", "X axis", ""),
+            ("Y_AXIS", "Y axis", ""),
+            ("Z_AXIS", "Z axis", ""),
+            ("MIN_AXIS","Minimal",""),
+            ("FAST_AXIS","Fast Oriented","Near minimal box from principal and extremal directions"),
+            ("OCTREE","Octree","Adaptive 3D subdivision into free standing boxes"),
+            ("CONVEX","Convex Decomposition","A few convex hulls following concave shapes"),
+            ],
+        default="X_AXIS"
+    )
+    fast_tolerance : FloatProperty(
+        name='Tolerance',
+        description="Stop refining once the box volume is within this percentage of its lower bound",
+        min=0.0, max=100.0,
+        default=0.0,
+        subtype='PERCENTAGE',
+    )
+    fast_hull : BoolProperty(
+        name='Use Convex Hull',
+        description="Fit the box to the convex hull, slower but with a tighter volume bound",
+        default=False,
+    )
+    octree_depth : IntProperty(
+        name='Max Depth',
+        description="Subdivision levels of the octree, the finest voxel grid is 2^depth per axis",
+        min=1, max=10,
+        default=5,
+    )
+    octree_threshold : FloatProperty(
+        name='Excess Threshold',
+        description="Split a box while its volume exceeds the occupied volume by more than this percentage",
+        min=0.0, max=100.0,
+        default=50.0,
+        subtype='PERCENTAGE',
+    )
+    max_boxes : IntProperty(
+        name='Max Boxes',
+        description="Box budget of the octree",
+        min=1, max=100000,
+        default=64,
+    )
+    acd_max_hulls : IntProperty(
+        name='Max Hulls',
+        description="Most convex pieces a mesh is split into",
+        min=1, max=256,
+        default=16,
+    )
+    acd_max_verts : IntProperty(
+        name='Max Hull Vertices',
+        description="Most vertices per convex piece",
+        min=4, max=255,
+        default=32,
+    )
+    acd_resolution : IntProperty(
+        name='Resolution',
+        description="Voxels along the longest side used to measure concavity",
+        min=8, max=256,
+        default=32,
+    )
+    acd_concavity : FloatProperty(
+        name='Concavity',
+        description="Only split when it removes more than this percentage of the volume as concavity",
+        min=0.0, max=100.0,
+        default=2.0,
+        subtype='PERCENTAGE',
+    )
+    covex_mesh : BoolProperty(
+        name='Force Convex',
+        description="Will ensure mesh is convex",
+        default=False,
+    )
+
+    subdiv_type : EnumProperty(
+        name='Type',
+        description="Mode of subdivision applied",
+        items=[
+            ("DIV", "By Subdivsion Number", ""),
+            ("CHK", "By Box Size", ""),
+            ],
+        default="DIV"
+    )
+
+    collapse : EnumProperty(
+        name='Collapse',
+        description="Collapse all bounding boxes into a single one",
+        items=[
+            ("NON", "No collapse", ""),
+            ("AVG", "Collapse to average", ""),
+            ("MIN", "Collapse to minimum", ""),
+            ("MEDIAN", "Collapse to median", ""),
+            ("WAVG", "Collapse to volume weighted average", ""),
+            ("UNION", "Collapse to union", ""),
+            ],
+        default="NON"
+    )
+
+    div : IntProperty(
+        name='Subdivision Number',
+        description="Number of bounding boxes generated",
+        min=1, max=100000,
+        default=1,
+    )
+
+    chk : FloatProperty(
+        name='Box Size',
+        description="Size of chunk in axis",
+        min=0.001, max=100000.0,
+        default=1,
+    )
+
+    offset : FloatProperty(
+        name='Offset',
+        description="Subdivision Offset",
+        min=-100000.0, max=100000.0,
+        default=0.0,
+    )
+
+    force_vol : BoolProperty(
+        name='Force Fill Axis',
+        description="Subdivisions include all vertices along the axis",
+        default=True,
+    )
+    shared_mesh : BoolProperty(
+        name='Shared mesh',
+        description="All selected objects will generate the same mesh",
+        default=False,
+    )
+
+    use_parallel : BoolProperty(
+        name='Parallel',
+        description="Compute the boxes of the selected objects in worker processes",
+        default=False,
+    )
+
+    workers : IntProperty(
+        name='Workers',
+        description="Number of worker processes, 0 uses every core",
+        min=0, max=256,
+        default=0,
+    )
+
+    use_streaming : BoolProperty(
+        name='Streaming',
+        description="Read vertices in chunks to bound memory on very large meshes, needs Blender 3.5 or newer",
+        default=False,
+    )
+
+    stream_chunk : IntProperty(
+        name='Chunk size',
+        description="Vertices read per chunk in streaming mode",
+        min=1024, max=100000000,
+        default=1000000,
+    )
+
+    use_disk_cache : BoolProperty(
+        name='Disk cache',
+        description="Reuse boxes stored on disk for unchanged meshes and settings",
+        default=False,
+    )
+
+    cache_dir : StringProperty(
+        name='Cache directory',
+        description="Where cached boxes are stored, relative paths start next to the .blend file",
+        default="//collision_cache",
+        subtype='DIR_PATH',
+    )
+
+    cache_size : IntProperty(
+        name='Cache size (MB)',
+        description="Least recently used entries are removed beyond this size",
+        min=1, max=1000000,
+        default=512,
+    )
+
+    use_lod : BoolProperty(
+        name='LOD pyramid',
+        description="Also create coarser collision levels merged from the finest subdivision",
+        default=False,
+    )
+
+    lod_levels : IntProperty(
+        name='Levels',
+        description="Number of collision levels, the first one uses the full subdivision",
+        min=2, max=16,
+        default=4,
+    )
+
+    lod_factor : IntProperty(
+        name='Reduction',
+        description="Boxes merged into one from each level to the next",
+        min=2, max=64,
+        default=4,
+    )
+
+    lod_suffix : StringProperty(
+        name='LOD suffix',
+        description="Added before the name suffix together with the level number",
+        default="_LOD",
+        maxlen=255,
+    )
+
+    use_profiling : BoolProperty(
+        name='Profile',
+        description="Time every phase per object and report a summary",
+        default=False,
+    )
+
+    profile_path : StringProperty(
+        name='Profile file',
+        description="Also write the timings to this file, leave empty to only report them",
+        default="",
+        subtype='FILE_PATH',
+    )
+
+    profile_format : EnumProperty(
+        name='Format',
+        description="Layout of the profile file",
+        items=[
+            ("JSON", "JSON", "Totals per phase and per object"),
+            ("TRACE", "Chrome trace", "Every timed phase, for chrome://tracing or Perfetto"),
+            ],
+        default="JSON"
+    )
+
+    output : EnumProperty(
+        name='Output',
+        description="What the computed boxes are turned into",
+        items=[
+            ("OBJECTS", "Objects", "A collision mesh object per source"),
+            ("SIDECAR", "Sidecar file", "Box primitives written to a file, no objects"),
+            ("BOTH", "Objects and sidecar", ""),
+            ],
+        default="OBJECTS"
+    )
+
+    export_path : StringProperty(
+        name='Sidecar',
+        description="Base path of the .npy box array and its .json index",
+        default="//collision_boxes",
+        subtype='FILE_PATH',
+    )
+
+    show_overlay : BoolProperty(
+        name='Viewport overlay',
+        description="Draw the boxes as one viewport overlay, replaced or cleared on the next run",
+        default=False,
+    )
+
+    live_link : BoolProperty(
+        name='Live update',
+        description="Regenerate the collision mesh whenever its source mesh changes",
+        default=False,
+    )
+
+    parent : BoolProperty(
+        name='Auto child',
+        description="Make generated object a child of the original mesh",
+        default=True,
+    )
+
+    suffix: StringProperty(
+        name='Name suffix',
+        default="-colonly",
+        maxlen=255,
+    )
+
+    def execute(self, context):
+
+        self.profiler = profiling.PhaseProfiler() if self.use_profiling else profiling.NULL_PROFILER
+        self.genereate_bb_col(context)
+        if(self.profiler.enabled):
+            self.report_profile()
+        if(self.live_link):
+            live_state["index"] = None
+
+        return {'FINISHED'}
+
+    def draw(self,context):
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.prop(self, 'mode')
+        if(self.mode == "BOUND"):
+            # Pyramid levels come from one binning per mesh, without collapse,
+            # streaming, sharing, worker processes or the disk cache
+            lod = self.use_lod and self.axis in kernel.AXIS_INDEX
+            row = layout.row(align=True)
+            row.prop(self, 'axis')
+            if(self.axis == "FAST_AXIS"):
+                row = layout.row(align=True)
+                row.prop(self, 'fast_tolerance')
+                row = layout.row(align=True)
+                row.prop(self, 'fast_hull')
+            elif(self.axis == "CONVEX"):
+                row = layout.row(align=True)
+                row.prop(self, 'acd_max_hulls')
+                row.prop(self, 'acd_max_verts')
+                row = layout.row(align=True)
+                row.prop(self, 'acd_resolution')
+                row.prop(self, 'acd_concavity')
+                row = layout.row(align=True)
+                row.prop(self,'shared_mesh')
+            elif(self.axis == "OCTREE"):
+                row = layout.row(align=True)
+                row.prop(self, 'octree_depth')
+                row = layout.row(align=True)
+                row.prop(self, 'octree_threshold')
+                row = layout.row(align=True)
+                row.prop(self, 'max_boxes')
+                row = layout.row(align=True)
+                row.prop(self,'covex_mesh')
+                row = layout.row(align=True)
+                row.prop(self,'shared_mesh')
+            elif(self.axis not in ORIENTED_AXES):
+                row = layout.row(align=True)
+                row.prop(self, 'subdiv_type')
+                row = layout.row(align=True)
+                if(self.subdiv_type == "DIV"):
+                    row = layout.row(align=True)
+                    row.prop(self, 'div')
+                if(self.subdiv_type == "CHK"):
+                    row = layout.row(align=True)
+                    row.prop(self, 'chk')
+
+                row = layout.row(align=True)
+                row.prop(self,'offset')
+                if(not lod):
+                    row = layout.row(align=True)
+                    row.prop(self,'collapse')
+                row = layout.row(align=True)
+                row.prop(self,'force_vol')
+                row = layout.row(align=True)
+                row.prop(self,'covex_mesh')
+
+                if(not lod):
+                    row = layout.row(align=True)
+                    row.prop(self,'shared_mesh')
+
+                    row = layout.row(align=True)
+                    row.prop(self,'use_streaming')
+                    if(self.use_streaming):
+                        row.prop(self,'stream_chunk')
+
+                row = layout.row(align=True)
+                row.prop(self,'use_lod')
+                if(self.use_lod):
+                    row = layout.row(align=True)
+                    row.prop(self,'lod_levels')
+                    row.prop(self,'lod_factor')
+                    row = layout.row(align=True)
+                    row.prop(self,'lod_suffix')
+
+            if(self.axis != "CONVEX" and not lod):
+                row = layout.row(align=True)
+                row.prop(self,'output')
+                if(self.output != "OBJECTS"):
+                    row = layout.row(align=True)
+                    row.prop(self,'export_path')
+                row = layout.row(align=True)
+                row.prop(self,'show_overlay')
+            row = layout.row(align=True)
+            row.prop(self,'live_link')
+            if(not lod):
+                row = layout.row(align=True)
+                row.prop(self,'use_parallel')
+                if(self.use_parallel):
+                    row.prop(self,'workers')
+                row = layout.row(align=True)
+                row.prop(self,'use_disk_cache')
+                if(self.use_disk_cache):
+                    row = layout.row(align=True)
+                    row.prop(self,'cache_dir')
+                    row = layout.row(align=True)
+                    row.prop(self,'cache_size')
+
+        elif(self.mode == "DECIM"):
+            row = layout.row(align=True)
+            row.prop(self, 'decimate_method')
+            row = layout.row(align=True)
+            row.prop(self, 'decimate_rat')
+
+        row = layout.row(align=True)
+        row.prop(self,'parent')
+        row = layout.row(align=True)
+        row.prop(self,'suffix')
+        row = layout.row(align=True)
+        row.prop(self,'use_profiling')
+        if(self.use_profiling):
+            row.prop(self,'profile_format')
+            row = layout.row(align=True)
+            row.prop(self,'profile_path')
+        
+
+    def genereate_bb_col(self, context):
+
+        selection = bpy.context.selected_objects
+
+        if(self.mode == "BOUND" and self.use_lod and self.axis in kernel.AXIS_INDEX):
+            self.generate_lods(context,selection)
+
+        elif(self.mode == "BOUND"):
+            results = self.compute_boxes(context,selection)
+            # Hulls are not boxes, they always become objects
+            primitives = self.axis != "CONVEX"
+            if(primitives and self.output != "OBJECTS"):
+                self.export_sidecar(selection,results)
+            clear_overlay()
+            if(primitives and self.show_overlay):
+                show_overlay([(m_object.matrix_world, bb_verts) for m_object,(_,bb_verts) in zip(selection,results)],
+                             kernel.box_layout(self.axis))
+            if(primitives and self.output == "SIDECAR"):
+                return
+
+            meshes = {}
+            for m_object,(key,bb_verts) in zip(selection,results):
+                self.profiler.set_object(m_object.name)
+                bb_mesh = meshes.get(key)
+                if(bb_mesh is None):
+                    bb_mesh = meshes[key] = self.build_mesh(m_object.name + "_colmesh",bb_verts)
+
+                bb_object = self.link_collision(m_object,m_object.name + self.suffix,bb_mesh)
+                if(self.live_link):
+                    self.tag_live(bb_object,m_object)
+
+        elif(self.mode == "DECIM"):
+            self.generate_decimated(context,[m_object for m_object in selection if m_object.type == 'MESH'])
+
+    def export_sidecar(self,selection,results):
+        """Write the boxes of every selected object as primitives, see export"""
+        layout = kernel.box_layout(self.axis)
+        records = {}
+        entries = []
+        for m_object,(key,bb_verts) in zip(selection,results):
+            if(key not in records):
+                records[key] = kernel.box_primitives(bb_verts,layout)
+            entries.append((m_object.name, records[key], m_object.matrix_world))
+
+        path = output_path(self.export_path,"collision_boxes")
+        self.profiler.set_object(None)
+        with self.profiler.phase("export sidecar", sum(len(r) for _,r,_ in entries)):
+            array_path, _ = export.write_sidecar(path,entries)
+        self.report({'INFO'}, "Wrote %d boxes to %s" % (sum(len(r) for _,r,_ in entries), array_path))
+
+    def generate_decimated(self,context,selection):
+        """Decimated copies of the evaluated meshes, without any operator calls
+
+        Collapse adds a temporary modifier to every object, evaluates the
+        depsgraph once and reads the results back with new_from_object.
+        Vertex clustering reads each evaluated mesh and decimates it in NumPy.
+        """
+        modifiers = []
+        if(self.decimate_method == "COLLAPSE"):
+            for m_object in selection:
+                modifier = m_object.modifiers.new(m_object.name + "decim",'DECIMATE')
+                modifier.ratio = self.decimate_rat
+                modifier.use_collapse_triangulate = True
+                modifiers.append((m_object, modifier))
+
+        try:
+            with self.profiler.phase("evaluate depsgraph", len(selection)):
+                depsgraph = context.evaluated_depsgraph_get()
+            for m_object in selection:
+                self.profiler.set_object(m_object.name)
+                eval_object = m_object.evaluated_get(depsgraph)
+                if(self.decimate_method == "COLLAPSE"):
+                    with self.profiler.phase("copy evaluated mesh", len(m_object.data.vertices)):
+                        bb_mesh = bpy.data.meshes.new_from_object(eval_object)
+                    bb_mesh.name = m_object.name + "_colmesh"
+                else:
+                    bb_mesh = self.cluster_mesh(m_object.name + "_colmesh",eval_object)
+
+                bb_object = self.link_collision(m_object,m_object.name + self.suffix,bb_mesh)
+                if(not self.parent):
+                    bb_object.matrix_world = m_object.matrix_world
+        finally:
+            for m_object,modifier in modifiers:
+                m_object.modifiers.remove(modifier)
+
+    def cluster_mesh(self,name,eval_object):
+        mesh = eval_object.to_mesh()
+        try:
+            with self.profiler.phase("read vertices", len(mesh.vertices)):
+                coords = self.mesh_coords(mesh.vertices)
+                triangles = self.mesh_triangles(mesh)
+        finally:
+            eval_object.to_mesh_clear()
+
+        messages = []
+        with self.profiler.phase("vertex clustering", len(coords)):
+            verts, faces = kernel.cluster_decimate(coords,triangles,self.decimate_rat,report=messages.append)
+        self.report_messages(messages)
+        bb_mesh = bpy.data.meshes.new(name=name)
+        with self.profiler.phase("mesh build", len(verts)):
+            self.fill_mesh(bb_mesh,verts,faces)
+        return bb_mesh
+
+    def generate_lods(self,context,selection):
+        """One collision object per pyramid level, all levels from a single binning"""
+        params = kernel.CollisionParams.from_operator(self)
+
+        levels = {}
+        messages = []
+        for m_object in selection:
+            self.profiler.set_object(m_object.name)
+            lod_meshes = levels.get(m_object.data)
+            if(lod_meshes is None):
+                lod_meshes = levels[m_object.data] = self.lod_meshes(m_object,params,messages)
+
+            for level,bb_mesh in enumerate(lod_meshes):
+                bb_object = self.link_collision(m_object,m_object.name + self.lod_suffix + str(level) + self.suffix,bb_mesh)
+                if(self.live_link):
+                    self.tag_live(bb_object,m_object,level)
+        self.report_messages(messages)
+
+    def link_collision(self,m_object,obj_name,bb_mesh):
+        bb_object=bpy.data.objects.new(obj_name, bb_mesh)
+
+        bpy.context.collection.objects.link(bb_object)
+        if(self.parent):
+            bb_object.parent=m_object
+        return bb_object
+
+    def tag_live(self,bb_object,m_object,level=-1):
+        """Record what produced bb_object so edits to m_object can regenerate it"""
+        settings = self.as_keywords(ignore=LIVE_IGNORED)
+        bb_object["collision_source"] = m_object
+        bb_object["collision_settings"] = json.dumps(settings, sort_keys=True)
+        bb_object["collision_lod"] = level
+
+    def report_profile(self):
+        for line in self.profiler.summary_lines():
+            self.report({'INFO'}, line)
+        if(self.profile_path):
+            path = output_path(self.profile_path,"collision_profile.json")
+            self.profiler.write(path,self.profile_format == "TRACE")
+            self.report({'INFO'}, "Wrote profile to %s" % path)
+
+def output_path(path,fallback):
+    """Absolute path of a path setting
+
+    Paths relative to an unsaved file have no directory to start from, they
+    go to Blender's temporary directory under their own name or fallback.
+    """
+    resolved = bpy.path.abspath(path)
+    if(resolved.startswith("//") or not os.path.isabs(resolved)):
+        resolved = os.path.join(bpy.app.tempdir, os.path.basename(resolved.rstrip("/\\")) or fallback)
+    return resolved
+
+overlay_state = {"handler": None}
+
+def show_overlay(items,layout):
+    """Draw the box edges of [(world matrix, box corners)] in every 3D viewport
+
+    All boxes go into one line batch in world space, it does not follow
+    objects moved afterwards.
+    """
+    if(bpy.app.background or not items):
+        return
+    coords = np.concatenate([np.asarray(verts, dtype=np.float64).dot(np.array(matrix)[:3,:3].T) + np.array(matrix)[:3,3]
+                             for matrix,verts in items])
+    boxes = len(coords) // 8
+    if(boxes == 0):
+        return
+    edges = (kernel.box_edges(layout)[None] + 8 * np.arange(boxes)[:,None,None]).reshape(-1,2)
+    shader = gpu.shader.from_builtin('UNIFORM_COLOR' if bpy.app.version >= (3, 4, 0) else '3D_UNIFORM_COLOR')
+    batch = batch_for_shader(shader,'LINES',{"pos": coords.astype(np.float32)},indices=edges.astype(np.int32))
+
+    def draw():
+        shader.bind()
+        shader.uniform_float("color", (0.2, 0.9, 0.4, 1.0))
+        batch.draw(shader)
+
+    overlay_state["handler"] = bpy.types.SpaceView3D.draw_handler_add(draw,(),'WINDOW','POST_VIEW')
+    redraw_viewports()
+
+def clear_overlay():
+    if(overlay_state["handler"] is not None):
+        bpy.types.SpaceView3D.draw_handler_remove(overlay_state["handler"],'WINDOW')
+        overlay_state["handler"] = None
+        redraw_viewports()
+
+@persistent
+def overlay_reset(*args):
+    # The boxes are in the world space of the file they were made in
+    clear_overlay()
+
+def redraw_viewports():
+    window_manager = bpy.context.window_manager
+    if(window_manager is None):
+        return
+    for window in window_manager.windows:
+        for area in window.screen.areas:
+            if(area.type == 'VIEW_3D'):
+                area.tag_redraw()
+
+
+class LiveRebuild(CollisionBuilder):
+    """Operator settings read back from a live collision object"""
+
+    def __init__(self,settings):
+        # Objects tagged by older versions lack the settings added since
+        self.__dict__.update(operator_defaults())
+        self.__dict__.update(settings)
+        self.shared_mesh = False
+        self.profiler = profiling.NULL_PROFILER
+
+    def report(self,level,message):
+        print("Collision live update: " + message)
+
+
+def operator_defaults():
+    """{property: default} of every OBJECT_OT_create_collision setting"""
+    defaults = {}
+    for prop in OBJECT_OT_create_collision.bl_rna.properties:
+        if(prop.identifier == "rna_type"):
+            continue
+        if(getattr(prop, "is_array", False)):
+            defaults[prop.identifier] = tuple(prop.default_array)
+        elif(prop.type == 'ENUM' and prop.is_enum_flag):
+            defaults[prop.identifier] = set(prop.default_flag)
+        else:
+            defaults[prop.identifier] = prop.default
+    return defaults
+
+
+live_state = {"dirty": set(), "changed": 0.0, "index": None, "failed": set()}
+
+def live_index():
+    """{source: [collision objects]} and {mesh: {sources}} of the live objects
+
+    Keyed by the datablocks themselves so renames keep working, the index is
+    rebuilt after loading, undo and redo which invalidate them.
+    """
+    if(live_state["index"] is None):
+        sources = {}
+        meshes = {}
+        for obj in bpy.data.objects:
+            source = obj.get("collision_source")
+            if(source is not None and "collision_settings" in obj):
+                sources.setdefault(source, []).append(obj)
+                if(source.data is not None):
+                    meshes.setdefault(source.data, set()).add(source)
+        live_state["index"] = (sources, meshes)
+    return live_state["index"]
+
+@persistent
+def live_reset(*args):
+    live_state["index"] = None
+    live_state["dirty"].clear()
+    live_state["failed"].clear()
+
+@persistent
+def live_depsgraph_update(scene, depsgraph):
+    """Mark the live sources whose geometry changed, then (re)start the debounce"""
+    if(not (depsgraph.id_type_updated('OBJECT') or depsgraph.id_type_updated('MESH'))):
+        return
+    sources, meshes = live_index()
+    if(not sources):
+        return
+
+    dirty = live_state["dirty"]
+    marked = False
+    for update in depsgraph.updates:
+        if(not update.is_updated_geometry):
+            continue
+        data = update.id.original
+        if(isinstance(data, bpy.types.Object) and data in sources):
+            dirty.add(data)
+            marked = True
+        elif(isinstance(data, bpy.types.Mesh) and data in meshes):
+            dirty.update(meshes[data])
+            marked = True
+    dirty -= live_state["failed"]
+
+    if(marked):
+        live_state["changed"] = time.monotonic()
+        if(not bpy.app.timers.is_registered(live_tick)):
+            bpy.app.timers.register(live_tick, first_interval=LIVE_DELAY)
+
+def live_tick():
+    """Regenerate dirty sources for at most LIVE_BUDGET seconds per call"""
+    wait = LIVE_DELAY - (time.monotonic() - live_state["changed"])
+    if(wait > 0):
+        return wait
+
+    dirty = live_state["dirty"]
+    start = time.perf_counter()
+    postponed = set()
+    while(dirty and time.perf_counter() - start < LIVE_BUDGET):
+        source = dirty.pop()
+        try:
+            # Edit mode changes only reach the mesh when leaving it
+            if(source.mode == 'EDIT'):
+                postponed.add(source)
+            else:
+                live_regenerate(source)
+        except ReferenceError:
+            # Deleted since it was marked
+            live_state["index"] = None
+        except Exception as error:
+            # Raising would unregister the timer, skip the source until the
+            # next load, undo or redo instead of failing on every edit
+            live_state["failed"].add(source)
+            print("Collision live update: %s failed and is no longer updated, %s: %s" % (
+                source.name, type(error).__name__, error))
+    dirty |= postponed
+    if(not dirty):
+        return None
+    return LIVE_DELAY if postponed and len(dirty) == len(postponed) else 0.01
+
+def live_regenerate(source):
+    """Rebuild every live collision object of source with its stored settings"""
+    sources, _ = live_index()
+    groups = {}
+    for bb_object in sources.get(source, ()):
+        try:
+            if(bb_object.get("collision_source") == source):
+                groups.setdefault(bb_object["collision_settings"], []).append(bb_object)
+        except ReferenceError:
+            live_state["index"] = None
+
+    for settings,bb_objects in groups.items():
+        builder = LiveRebuild(json.loads(settings))
+        if(builder.use_lod and builder.axis in kernel.AXIS_INDEX):
+            params = kernel.CollisionParams.from_operator(builder)
+            messages = []
+            lod_meshes = builder.lod_meshes(source,params,messages)
+            builder.report_messages(messages)
+        else:
+            [(_, bb_verts)] = builder.compute_boxes(bpy.context,[source])
+            lod_meshes = [builder.build_mesh(source.name + "_colmesh",bb_verts)]
+
+        for bb_object in bb_objects:
+            level = min(max(bb_object.get("collision_lod", -1), 0), len(lod_meshes) - 1)
+            old_mesh = bb_object.data
+            bb_object.data = lod_meshes[level]
+            if(old_mesh is not None and old_mesh.users == 0):
+                name = old_mesh.name
+                bpy.data.meshes.remove(old_mesh)
+                lod_meshes[level].name = name
+        for bb_mesh in lod_meshes:
+            if(bb_mesh.users == 0):
+                bpy.data.meshes.remove(bb_mesh)
+
+def add_object_button(self, context):
+		self.layout.operator(
+            OBJECT_OT_create_collision.bl_idname,
+            text= "Create Collision Mesh",
+            icon="CLIPUV_HLT")
+
+LIVE_RESET_HANDLERS = ("load_post", "undo_post", "redo_post")
+
+def register():
+    bpy.utils.register_class(OBJECT_OT_create_collision)
+    bpy.types.VIEW3D_MT_mesh_add.append(add_object_button)
+    bpy.app.handlers.depsgraph_update_post.append(live_depsgraph_update)
+    for handlers in LIVE_RESET_HANDLERS:
+        getattr(bpy.app.handlers, handlers).append(live_reset)
+    bpy.app.handlers.load_post.append(overlay_reset)
+
+def unregister():
+    bpy.utils.unregister_class(OBJECT_OT_create_collision)
+    bpy.types.VIEW3D_MT_mesh_add.remove(add_object_button)
+    bpy.app.handlers.depsgraph_update_post.remove(live_depsgraph_update)
+    for handlers in LIVE_RESET_HANDLERS:
+        getattr(bpy.app.handlers, handlers).remove(live_reset)
+    bpy.app.handlers.load_post.remove(overlay_reset)
+    if(bpy.app.timers.is_registered(live_tick)):
+        bpy.app.timers.unregister(live_tick)
+    clear_overlay()
+
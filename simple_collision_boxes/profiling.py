@@ -0,0 +1,113 @@
+"""Per-phase wall time profiling of collision generation.
+
+PhaseProfiler records every timed phase with the object it belongs to, the
+number of items it handled and its start and duration. NullProfiler has the
+same interface and records nothing, its phase() hands back one shared no-op
+context so disabled profiling costs a method call per phase.
+"""
+
+import contextlib
+import json
+import time
+from collections import defaultdict
+
+_NO_PHASE = contextlib.nullcontext()
+
+
+class NullProfiler:
+    enabled = False
+
+    def set_object(self, name):
+        pass
+
+    def phase(self, name, items=0):
+        return _NO_PHASE
+
+
+# Default of the kernel functions taking an optional profiler
+NULL_PROFILER = NullProfiler()
+
+
+class PhaseProfiler:
+    enabled = True
+
+    def __init__(self):
+        self.events = []
+        self.object = None
+        self.origin = time.perf_counter()
+
+    def set_object(self, name):
+        """Attribute the following phases to the object called name"""
+        self.object = name
+
+    @contextlib.contextmanager
+    def phase(self, name, items=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.events.append((self.object, name, start - self.origin, time.perf_counter() - start, items))
+
+    def totals(self):
+        """{phase: [seconds, calls, items]} over every object"""
+        totals = defaultdict(lambda: [0.0, 0, 0])
+        for _, name, _, seconds, items in self.events:
+            total = totals[name]
+            total[0] += seconds
+            total[1] += 1
+            total[2] += items
+        return dict(totals)
+
+    def object_totals(self):
+        """{object: {phase: [seconds, calls, items]}}"""
+        totals = defaultdict(lambda: defaultdict(lambda: [0.0, 0, 0]))
+        for obj, name, _, seconds, items in self.events:
+            total = totals[obj][name]
+            total[0] += seconds
+            total[1] += 1
+            total[2] += items
+        return {obj: dict(phases) for obj, phases in totals.items()}
+
+    def summary_lines(self, slowest=3):
+        """Phases by total time, then the objects that took longest
+
+        Phases can nest, kernel phases run inside the per object ones, so the
+        phase times do not add up to the wall time.
+        """
+        lines = ["%s: %.3fs, %d calls, %d items" % (name, seconds, calls, items)
+                 for name, (seconds, calls, items) in sorted(self.totals().items(), key=lambda item: -item[1][0])]
+
+        object_seconds = defaultdict(float)
+        for obj, _, _, seconds, _ in self.events:
+            if(obj is not None):
+                object_seconds[obj] += seconds
+        for obj, seconds in sorted(object_seconds.items(), key=lambda item: -item[1])[:slowest]:
+            lines.append("slowest %s: %.3fs" % (obj, seconds))
+        return lines
+
+    def as_dict(self):
+        def phase_dict(phases):
+            return {name: {"seconds": seconds, "calls": calls, "items": items}
+                    for name, (seconds, calls, items) in phases.items()}
+        return {
+            "phases": phase_dict(self.totals()),
+            "objects": {str(obj): phase_dict(phases) for obj, phases in self.object_totals().items()},
+        }
+
+    def chrome_trace(self):
+        """Events in the Chrome trace format, for chrome://tracing or Perfetto"""
+        events = [{
+            "name": name,
+            "cat": "collision",
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": seconds * 1e6,
+            "pid": 0,
+            "tid": 0,
+            "args": {"object": obj, "items": items},
+        } for obj, name, start, seconds, items in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, path, trace=False):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace() if trace else self.as_dict(), f, indent=1)
@@ -0,0 +1,419 @@
+"""Regression tests of the collision kernel, run headless with pytest."""
+
+import os
+
+import numpy as np
+import pytest
+
+from simple_collision_boxes import cache, export, kernel, profiling
+
+# Corner order of the add-on before the kernel existed, per slab axis
+REFERENCE_CORNERS = {
+    0: ((0,0,0),(0,1,0),(0,1,1),(0,0,1),(1,0,0),(1,1,0),(1,1,1),(1,0,1)),
+    1: ((0,0,0),(0,0,1),(1,0,1),(1,0,0),(0,1,0),(0,1,1),(1,1,1),(1,1,0)),
+    2: ((0,0,0),(1,0,0),(1,1,0),(0,1,0),(0,0,1),(1,0,1),(1,1,1),(0,1,1)),
+}
+
+
+def reference_box(points, a):
+    if(len(points) < 2):
+        return []
+    bounds = (tuple(min(p[i] for p in points) for i in range(3)),
+              tuple(max(p[i] for p in points) for i in range(3)))
+    return [tuple(bounds[pick[i]][i] for i in range(3)) for pick in REFERENCE_CORNERS[a]]
+
+
+def reference_slabs(points, params):
+    """divide_mesh_by_div and divide_mesh_by_chk of the original add-on, one axis at a time"""
+    a = kernel.AXIS_INDEX[params.axis]
+    lo = min(p[a] for p in points)
+    hi = max(p[a] for p in points)
+    min_pos = lo + params.offset
+    verts = []
+    if(params.subdiv_type == "DIV"):
+        if(params.div == 1):
+            return reference_box(points, a)
+        chunk = float((hi - lo) / params.div)
+        for i in range(params.div):
+            slab = [p for p in points if p[a] >= min_pos + chunk * i and p[a] < min_pos + chunk * (i + 1)]
+            if(params.force_vol and i == 0):
+                slab = [p for p in points if p[a] < min_pos + chunk]
+            if(params.force_vol and i == params.div - 1):
+                slab = [p for p in points if p[a] >= min_pos + chunk * i]
+            verts.extend(reference_box(slab, a))
+        return verts
+
+    div = int((hi - lo) / params.chk)
+    if(div == 0 or (div == 1 and params.force_vol)):
+        return reference_box(points, a)
+    if(div == 1):
+        return reference_box([p for p in points if p[a] >= min_pos and p[a] < min_pos + params.chk], a)
+    for i in range(div):
+        slab = [p for p in points if p[a] >= min_pos + params.chk * i and p[a] < min_pos + params.chk * (i + 1)]
+        if(params.force_vol and i == div - 1):
+            slab = [p for p in points if p[a] >= min_pos + params.chk * i]
+        elif(params.force_vol and i == 0):
+            slab = [p for p in points if p[a] >= lo and p[a] < min_pos + params.chk]
+        verts.extend(reference_box(slab, a))
+    return verts
+
+
+def reference_average(verts, params):
+    """AVG collapse_bb of the original add-on"""
+    if(len(verts) < 8):
+        return []
+    boxes = np.array(verts, dtype=np.float64).reshape(-1,8,3)
+    box = boxes.mean(axis=0)
+    if(params.force_vol):
+        a = kernel.AXIS_INDEX[params.axis]
+        box[:4,a] = boxes[...,a].min()
+        box[4:,a] = boxes[...,a].max()
+    return box
+
+
+def reference_faces(verts):
+    faces = []
+    for i in range(2 * (len(verts) // 8) - 1):
+        faces.extend([(0+4*i,4+4*i,7+4*i,3+4*i),(3+4*i,7+4*i,6+4*i,2+4*i),
+                      (2+4*i,6+4*i,5+4*i,1+4*i),(1+4*i,5+4*i,4+4*i,0+4*i)])
+    top = len(verts) - 1
+    faces.extend([(0,3,2,1),(top-3,top-2,top-1,top)])
+    return faces
+
+
+def random_params(rng):
+    return kernel.CollisionParams(
+        axis=str(rng.choice(list(kernel.AXIS_INDEX))),
+        subdiv_type=str(rng.choice(["DIV", "CHK"])),
+        div=int(rng.integers(1, 30)),
+        chk=float(np.float32(rng.uniform(0.05, 3.0))),
+        offset=float(np.float32(rng.uniform(-1.0, 1.0))),
+        force_vol=bool(rng.integers(0, 2)),
+        collapse=str(rng.choice(["NON", "AVG"])),
+    )
+
+
+def test_slabs_match_original_division():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        coords = (rng.normal(size=(int(rng.integers(1, 200)),3)) * rng.uniform(0.1, 5.0)).astype(np.float32)
+        params = random_params(rng)
+        expected = reference_slabs([tuple(map(float, p)) for p in coords], params)
+        if(params.collapse == "AVG"):
+            expected = reference_average(expected, params)
+        expected = np.asarray(expected, dtype=np.float64).reshape(-1,3)
+
+        verts = kernel.slab_boxes(coords, params)
+        np.testing.assert_allclose(verts, expected, rtol=1e-6, atol=1e-6, err_msg=repr(params))
+        if(len(verts) > 7):
+            np.testing.assert_array_equal(np.asarray(kernel.make_faces(verts)).reshape(-1,4), reference_faces(expected))
+
+
+def test_streamed_slabs_match_whole_array():
+    rng = np.random.default_rng(2)
+    coords = rng.normal(size=(5000,3)).astype(np.float32)
+    params = kernel.CollisionParams(div=12, force_vol=False)
+    chunks = lambda: (coords[start:start + 700] for start in range(0, len(coords), 700))
+    np.testing.assert_array_equal(kernel.streamed_slab_boxes(chunks, params), kernel.slab_boxes(coords, params))
+
+
+def face_planes(verts, faces):
+    tri = verts[faces[:,:3]]
+    normals = np.cross(tri[:,1] - tri[:,0], tri[:,2] - tri[:,0])
+    return normals, np.einsum("ij,ij->i", normals, tri[:,0])
+
+
+def test_convex_hull_matches_scipy():
+    spatial = pytest.importorskip("scipy.spatial")
+    rng = np.random.default_rng(3)
+    for points in (rng.normal(size=(2000,3)), rng.uniform(-1.0, 1.0, (300,3)) * (5.0, 0.2, 1.0)):
+        verts, faces = kernel.convex_hull(points)
+        expected = spatial.ConvexHull(points)
+        assert kernel.hull_volume(verts, faces) == pytest.approx(expected.volume, rel=1e-9)
+        assert len(verts) == len(expected.vertices)
+        np.testing.assert_allclose(np.sort(verts, axis=0), np.sort(points[expected.vertices], axis=0))
+
+
+def test_convex_hull_encloses_its_points():
+    rng = np.random.default_rng(4)
+    points = rng.normal(size=(1000,3))
+    verts, faces = kernel.convex_hull(points)
+    normals, offsets = face_planes(verts, faces)
+    assert (points @ normals.T - offsets <= 1e-9 * np.abs(offsets).max()).all()
+
+
+def test_convex_hull_degenerate_input():
+    rng = np.random.default_rng(5)
+    cube = np.array(kernel.CUBE_VERTICES, dtype=np.float64)
+    verts, faces = kernel.convex_hull(np.concatenate([cube, rng.uniform(-0.9, 0.9, (200,3))]))
+    assert len(verts) == 8
+    assert kernel.hull_volume(verts, faces) == pytest.approx(8.0)
+
+    flat = np.c_[rng.uniform(size=(50,2)), np.zeros(50)]
+    verts, faces = kernel.convex_hull(flat)
+    assert faces.shape[0] == 1 and faces.shape[1] == len(verts)
+
+    line = np.outer(rng.uniform(size=20), (1.0, 2.0, 3.0))
+    verts, faces = kernel.convex_hull(line)
+    assert len(verts) == 2 and len(faces) == 0
+
+
+def test_min_oriented_box_finds_rotated_box():
+    rng = np.random.default_rng(6)
+    rotation, _ = np.linalg.qr(rng.normal(size=(3,3)))
+    points = rng.uniform(-1.0, 1.0, (500,3)) * (0.5, 1.0, 1.5)
+    points = np.concatenate([np.array(kernel.CUBE_VERTICES) * (0.5, 1.0, 1.5), points]) @ rotation.T
+    verts, faces = kernel.convex_hull(points)
+    box = kernel.min_oriented_box(verts, faces)
+    box_verts, box_faces = kernel.convex_hull(box)
+    assert kernel.hull_volume(box_verts, box_faces) == pytest.approx(6.0, rel=1e-6)
+
+
+def test_octree_boxes_cover_every_vertex():
+    rng = np.random.default_rng(7)
+    coords = rng.normal(size=(3000,3)).astype(np.float32)
+    coords[:,2] *= 0.1
+    verts = kernel.octree_boxes(coords, kernel.CollisionParams(axis="OCTREE", max_boxes=32))
+    boxes = verts.reshape(-1,8,3)
+    assert 1 < len(boxes) <= 32
+    lo, hi = boxes.min(axis=1), boxes.max(axis=1)
+    inside = ((coords[:,None] >= lo[None] - 1e-6) & (coords[:,None] <= hi[None] + 1e-6)).all(axis=2)
+    assert inside.any(axis=1).all()
+
+
+def uv_sphere(rings=40, segments=80):
+    """Vertices and triangles of a UV sphere without its pole caps"""
+    u, v = np.meshgrid(np.linspace(0.01, np.pi - 0.01, rings), np.linspace(0.0, 2 * np.pi, segments, endpoint=False), indexing="ij")
+    sphere = np.stack([np.sin(u) * np.cos(v), np.sin(u) * np.sin(v), np.cos(u)], axis=-1).reshape(-1,3)
+    grid = np.arange(u.size).reshape(u.shape)
+    a, b = grid[:-1], grid[1:]
+    c, d = np.roll(b, -1, axis=1), np.roll(a, -1, axis=1)
+    return sphere, np.concatenate([np.stack([a,b,c], axis=-1).reshape(-1,3), np.stack([a,c,d], axis=-1).reshape(-1,3)])
+
+
+def box_mesh(lo, hi):
+    verts = np.asarray(lo) + (np.array(kernel.CUBE_VERTICES) + 1) / 2 * (np.asarray(hi) - np.asarray(lo))
+    quads = np.array(kernel.CUBE_INDICES)
+    return verts, np.concatenate([quads[:,[0,1,2]], quads[:,[0,2,3]]])
+
+
+def test_convex_decomposition_splits_only_concave_shapes():
+    parts = [box_mesh((0,0,0),(1,1,4)), box_mesh((1,0,0),(5,1,1)), box_mesh((5,0,0),(6,1,4))]
+    coords = np.concatenate([verts for verts,_ in parts])
+    triangles = np.concatenate([faces + 8 * i for i,(_,faces) in enumerate(parts)])
+    (verts, faces), _ = kernel.compute_boxes(coords, kernel.CollisionParams(axis="CONVEX", acd_max_hulls=8), triangles)
+    # The U holds 12 units, its single hull 24
+    assert 12.0 <= kernel.hull_volume(verts, faces) < 14.0
+
+    # A UV sphere is convex and stays one hull
+    sphere, triangles = uv_sphere()
+    (verts, faces), _ = kernel.compute_boxes(sphere, kernel.CollisionParams(axis="CONVEX"), triangles)
+    assert len(verts) <= kernel.CollisionParams.acd_max_verts
+    assert kernel.hull_volume(verts, faces) > 0.75 * 4.0 / 3.0 * np.pi
+
+
+def test_cache_key_follows_triangles(tmp_path):
+    disk = cache.DiskCache(str(tmp_path), 1 << 20)
+    coords = np.random.default_rng(9).normal(size=(100,3)).astype(np.float32)
+    params = kernel.CollisionParams(axis="CONVEX")
+    chunks = lambda: iter((coords[:40], coords[40:]))
+    assert disk.key(coords, params) == disk.stream_key(chunks, len(coords), params)
+    assert disk.key(coords, params, (), np.array([[0,1,2]])) != disk.key(coords, params, (), np.array([[0,2,1]]))
+
+    disk.store("hulls", (coords, np.array([[0,1,2]])))
+    verts, faces = disk.load("hulls")
+    np.testing.assert_array_equal(verts, coords)
+
+
+def box_volume(verts):
+    verts = np.asarray(verts).reshape(8,3)
+    edges = verts[[4,2,1]] - verts[0]
+    return abs(np.linalg.det(edges))
+
+
+def test_fast_oriented_box_fits_rotated_box():
+    rng = np.random.default_rng(10)
+    rotation, _ = np.linalg.qr(rng.normal(size=(3,3)))
+    points = np.concatenate([np.array(kernel.CUBE_VERTICES) * (0.5, 1.0, 1.5), rng.uniform(-1.0, 1.0, (500,3)) * (0.5, 1.0, 1.5)])
+    points = points @ rotation.T
+    verts = kernel.fast_oriented_box(points)
+    assert box_volume(verts) == pytest.approx(6.0, rel=1e-6)
+
+    hull_verts, hull_faces = kernel.convex_hull(points)
+    verts = kernel.fast_oriented_box(hull_verts, 0.0, hull_faces)
+    assert box_volume(verts) == pytest.approx(6.0, rel=1e-6)
+
+
+def test_fast_oriented_box_stops_within_tolerance():
+    points = np.random.default_rng(11).normal(size=(2000,3)) * (3.0, 1.0, 0.5)
+    calls = []
+    for tolerance in (0.0, 100.0):
+        profile = profiling.PhaseProfiler()
+        verts = kernel.fast_oriented_box(points, tolerance, profile=profile)
+        calls.append(profile.totals()["rotating calipers"][1])
+        # Every box encloses the points
+        axes = verts[[4,2,1]] - verts[0]
+        local = np.linalg.solve(axes.T, (points - verts[0]).T).T
+        assert ((local > -1e-9) & (local < 1 + 1e-9)).all()
+    # A loose enough tolerance accepts the first, principal axes box
+    assert calls[1] == 1 < calls[0]
+
+
+def test_parallel_boxes_do_not_depend_on_workers():
+    rng = np.random.default_rng(12)
+    coords_list = [rng.normal(size=(int(rng.integers(2, 3000)),3)).astype(np.float32) for _ in range(7)]
+    params = kernel.CollisionParams(axis="OCTREE", max_boxes=16)
+    serial = [kernel.compute_boxes(coords, params) for coords in coords_list]
+    for workers in (1, 3):
+        results = kernel.parallel_boxes(coords_list, params, workers=workers)
+        assert [messages for _, messages in results] == [messages for _, messages in serial]
+        for (verts, _), (expected, _) in zip(results, serial):
+            np.testing.assert_array_equal(verts, expected)
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    disk = cache.DiskCache(str(tmp_path), 1 << 20)
+    boxes = np.zeros((800,3))
+    for age, key in enumerate(("old", "used", "new")):
+        disk.store(key, boxes)
+        os.utime(disk.path(key), (1000 + age, 1000 + age))
+    assert disk.load("old") is not None
+    assert sorted(os.listdir(tmp_path)) == ["new.npz", "old.npz", "used.npz"]
+
+    disk.max_bytes = 2 * os.path.getsize(disk.path("new"))
+    disk.evict()
+    assert disk.load("used") is None
+    assert disk.load("old") is not None and disk.load("new") is not None
+
+
+def test_cache_skips_damaged_entries(tmp_path):
+    disk = cache.DiskCache(str(tmp_path), 1 << 20)
+    disk.store("boxes", np.ones((8,3)))
+    with open(disk.path("boxes"), "r+b") as f:
+        f.truncate(40)
+    assert disk.load("boxes") is None
+    assert disk.load("missing") is None
+
+
+def test_collapse_reducers_match_numpy():
+    rng = np.random.default_rng(13)
+    lo = rng.normal(size=(9,3))
+    hi = lo + rng.uniform(0.1, 2.0, (9,3))
+    for axis, a in kernel.AXIS_INDEX.items():
+        verts = kernel.box_corners(lo, hi, axis)
+        boxes = verts.reshape(-1,8,3)
+        volumes = np.prod(hi - lo, axis=1)
+        union = kernel.box_corners(lo.min(axis=0)[None], hi.max(axis=0)[None], axis)
+        expected = {
+            "AVG": boxes.mean(axis=0),
+            # The box with the smallest extents, with its own corners
+            "MIN": boxes[volumes.argmin()],
+            "MEDIAN": np.median(boxes, axis=0),
+            "WAVG": (boxes * volumes[:,None,None]).sum(axis=0) / volumes.sum(),
+            "UNION": union,
+        }
+        for collapse, box in expected.items():
+            for force_vol in (False, True):
+                params = kernel.CollisionParams(axis=axis, collapse=collapse, force_vol=force_vol)
+                if(force_vol):
+                    box = box.copy()
+                    box[:4,a] = lo[:,a].min()
+                    box[4:,a] = hi[:,a].max()
+                np.testing.assert_allclose(kernel.collapse_bb(verts, params), box, err_msg=repr(params))
+
+
+def test_slab_pyramid_levels_match_direct_division():
+    rng = np.random.default_rng(14)
+    for _ in range(50):
+        coords = (rng.normal(size=(int(rng.integers(50, 3000)),3)) * rng.uniform(0.1, 5.0)).astype(np.float32)
+        factor = int(rng.integers(2, 5))
+        settings = dict(axis=str(rng.choice(list(kernel.AXIS_INDEX))), offset=float(np.float32(rng.uniform(-0.5, 0.5))),
+                        force_vol=bool(rng.integers(0, 2)))
+        div = factor**3 * int(rng.integers(1, 4))
+        pyramid = kernel.slab_pyramid(coords, kernel.CollisionParams(div=div, **settings), 3, factor)
+        assert len(pyramid) == 3
+        for level, verts in enumerate(pyramid):
+            direct = kernel.CollisionParams(div=div // factor**level, **settings)
+            np.testing.assert_allclose(verts, kernel.slab_boxes(coords, direct), rtol=1e-6, atol=1e-6,
+                                       err_msg="%r level %d" % (direct, level))
+
+
+def test_cluster_decimate_reaches_ratio():
+    coords, triangles = uv_sphere()
+    for ratio in (0.05, 0.25, 0.5):
+        verts, faces = kernel.cluster_decimate(coords, triangles, ratio)
+        assert abs(len(verts) - ratio * len(coords)) <= 0.25 * ratio * len(coords)
+        assert faces.min() == 0 and faces.max() == len(verts) - 1
+        assert ((faces[:,0] != faces[:,1]) & (faces[:,1] != faces[:,2]) & (faces[:,2] != faces[:,0])).all()
+        assert len(np.unique(np.sort(faces, axis=1), axis=0)) == len(faces)
+        np.testing.assert_allclose(np.linalg.norm(verts, axis=1), 1.0, atol=0.1)
+
+
+def test_cluster_decimate_keeps_faces_at_zero_ratio():
+    coords, triangles = uv_sphere()
+    messages = []
+    verts, faces = kernel.cluster_decimate(coords, triangles, 0.0, report=messages.append)
+    assert 4 <= len(verts) < 0.02 * len(coords) and len(faces) > 0
+    assert messages == []
+
+    verts, faces = kernel.cluster_decimate(coords, np.zeros((10,3), dtype=np.int64), 0.0, report=messages.append)
+    assert len(faces) == 0 and messages == [kernel.EMPTY_DECIMATE_MSG]
+
+
+def quaternion_matrices(quat):
+    w, x, y, z = np.asarray(quat, dtype=np.float64).T
+    return np.stack([
+        np.stack([1 - 2 * (y*y + z*z), 2 * (x*y - z*w), 2 * (x*z + y*w)], axis=-1),
+        np.stack([2 * (x*y + z*w), 1 - 2 * (x*x + z*z), 2 * (y*z - x*w)], axis=-1),
+        np.stack([2 * (x*z - y*w), 2 * (y*z + x*w), 1 - 2 * (x*x + y*y)], axis=-1),
+    ], axis=1)
+
+
+def primitive_corners(records):
+    """(K,8,3) corners rebuilt from BOX_DTYPE records, sorted per box"""
+    signs = np.array(kernel.CUBE_VERTICES, dtype=np.float64)
+    local = signs[None] * records["half_extents"].astype(np.float64)[:,None]
+    corners = np.einsum('kij,knj->kni', quaternion_matrices(records["rotation"]), local) + records["center"][:,None]
+    return np.array([box[np.lexsort(np.round(box, 4).T[::-1])] for box in corners])
+
+
+def sorted_corners(verts):
+    return np.array([box[np.lexsort(np.round(box, 4).T[::-1])] for box in np.asarray(verts).reshape(-1,8,3)])
+
+
+def test_box_primitives_rebuild_their_corners():
+    rng = np.random.default_rng(15)
+    coords = rng.normal(size=(2000,3)).astype(np.float32)
+    cases = [(axis, kernel.slab_boxes(coords, kernel.CollisionParams(axis=axis, div=6))) for axis in kernel.AXIS_INDEX]
+    cases.append(("OCTREE", kernel.octree_boxes(coords, kernel.CollisionParams(axis="OCTREE", max_boxes=12))))
+    rotation, _ = np.linalg.qr(rng.normal(size=(3,3)))
+    cases.append(("MIN_AXIS", kernel.fast_oriented_box(coords * (3.0, 1.0, 0.5) @ rotation.T)))
+    # A flat box still gets a right handed frame
+    cases.append(("Z_AXIS", kernel.box_corners([(0.0, 0.0, 1.0)], [(2.0, 3.0, 1.0)], "Z_AXIS")))
+
+    for axis, verts in cases:
+        records = kernel.box_primitives(verts, kernel.box_layout(axis))
+        assert len(records) == len(verts) // 8
+        np.testing.assert_allclose(np.linalg.norm(records["rotation"], axis=1), 1.0, atol=1e-6)
+        np.testing.assert_allclose(primitive_corners(records), sorted_corners(verts), atol=1e-4, err_msg=axis)
+
+
+def test_sidecar_round_trip(tmp_path):
+    coords = np.random.default_rng(16).normal(size=(500,3)).astype(np.float32)
+    crate = kernel.box_primitives(kernel.slab_boxes(coords, kernel.CollisionParams(div=4)), "X_AXIS")
+    barrel = kernel.box_primitives(kernel.fast_oriented_box(coords), "OCTREE")
+    matrix = np.identity(4)
+    matrix[:3,3] = (1.0, 2.0, 3.0)
+
+    array_path, index_path = export.write_sidecar(str(tmp_path / "boxes"), [("Crate", crate, matrix), ("Barrel", barrel, np.identity(4))])
+    assert os.path.basename(array_path) == "boxes.npy" and os.path.exists(index_path)
+    assert sorted(os.listdir(tmp_path)) == ["boxes.json", "boxes.npy"]
+
+    boxes, index = export.load_sidecar(str(tmp_path / "boxes.npy"))
+    assert boxes.dtype == kernel.BOX_DTYPE
+    for name, records in (("Crate", crate), ("Barrel", barrel)):
+        entry = index["objects"][name]
+        np.testing.assert_array_equal(boxes[entry["start"]:entry["start"] + entry["count"]], records)
+    assert index["objects"]["Crate"]["matrix_world"] == matrix.tolist()
+    np.testing.assert_allclose(primitive_corners(boxes[index["objects"]["Barrel"]["start"]:]),
+                               sorted_corners(kernel.fast_oriented_box(coords)), atol=1e-4)